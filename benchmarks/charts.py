@@ -0,0 +1,113 @@
+"""
+Chart payload and render benchmark.
+
+For the histogram and the weekly volume chart, compares the bytes shipped to
+the browser when row-level data is inlined as JSON, when pre-aggregated data
+is inlined as JSON, and when pre-aggregated data travels as Arrow IPC (what
+`mo.ui.altair_chart` sends). Also times data preparation, spec rendering and
+a `data_explorer.cached_chart` hit:
+
+    python -m benchmarks.charts --sizes 100000 1000000
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import polars as pl
+
+import data_explorer
+from benchmarks.generate import write_dataset
+from benchmarks.rollups import prepare_result
+from benchmarks.run import DATA_DIR, RESULTS_DIR, time_stage
+
+
+def payload(rows: pl.DataFrame, data: pl.DataFrame, repeat: int, build, *args) -> dict:
+    """Payload sizes and timings for one chart built by `build(data, *args)`."""
+    inline_rows = json.dumps(rows.to_dicts(), default=str)
+    inline_aggregated = json.dumps(data.to_dicts(), default=str)
+    arrow_aggregated = data.write_ipc(None).getvalue()
+
+    data_explorer.CHART_CACHE.clear()
+    _, cold = time_stage(lambda: build(data, *args).to_json(), repeat)
+    data_explorer.cached_chart(build, data, *args)
+    _, warm = time_stage(data_explorer.cached_chart, repeat, build, data, *args)
+
+    return {
+        "rows": rows.height,
+        "chart_rows": data.height,
+        "inline_rows_bytes": len(inline_rows),
+        "inline_aggregated_bytes": len(inline_aggregated),
+        "arrow_aggregated_bytes": len(arrow_aggregated),
+        "render_s": cold["best"],
+        "cached_s": warm["best"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark chart payload bytes and render time."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "charts.json")
+    args = parser.parse_args()
+
+    results = {"meta": {"seed": args.seed, "repeat": args.repeat}, "sizes": {}}
+    print(
+        f"{'rows':>12}  {'chart':<10}{'inline rows kB':>16}{'inline agg kB':>15}"
+        f"{'arrow agg kB':>14}{'render ms':>11}{'cached ms':>11}"
+    )
+
+    for n_rows in args.sizes:
+        data_path, references_path = write_dataset(
+            args.data_dir, n_rows, seed=args.seed
+        )
+        result = prepare_result(data_path, references_path)
+        avg = data_explorer.compute_kpis(result)["avg_appointments"]
+
+        hist, hist_prep = time_stage(
+            data_explorer.histogram_data, args.repeat, result, avg
+        )
+        week = data_explorer.build_rollups(result)["Week"]
+        volume, volume_prep = time_stage(
+            data_explorer.volume_data, args.repeat, week, "calendar"
+        )
+
+        charts = {
+            "histogram": payload(
+                result.select("max_appointment_number").drop_nulls(),
+                hist,
+                args.repeat,
+                data_explorer.histogram_chart,
+            ),
+            "volume": payload(
+                result.select("start_time", "calendar"),
+                volume,
+                args.repeat,
+                data_explorer.volume_chart,
+                "calendar",
+                "Week",
+            ),
+        }
+        charts["histogram"]["prepare_s"] = hist_prep["best"]
+        charts["volume"]["prepare_s"] = volume_prep["best"]
+        results["sizes"][str(n_rows)] = charts
+
+        for name, entry in charts.items():
+            print(
+                f"{n_rows:>12,}  {name:<10}{entry['inline_rows_bytes'] / 1e3:>16,.0f}"
+                f"{entry['inline_aggregated_bytes'] / 1e3:>15,.1f}"
+                f"{entry['arrow_aggregated_bytes'] / 1e3:>14,.1f}"
+                f"{entry['render_s'] * 1e3:>11.2f}{entry['cached_s'] * 1e3:>11.3f}"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
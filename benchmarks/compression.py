@@ -0,0 +1,104 @@
+"""
+Upload + parse benchmark for compressed exports.
+
+Compares plain CSV against .csv.gz, .csv.zst and .zip uploads of the same
+generated export. Upload time is estimated from the file size and a link
+speed; parse time is measured with `data_explorer.read_table`:
+
+    python -m benchmarks.compression --sizes 100000 1000000 --mbps 20
+"""
+
+import argparse
+import gzip
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import data_explorer
+from benchmarks.generate import write_dataset
+from benchmarks.run import DATA_DIR, RESULTS_DIR, time_stage
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+
+def compressed_variants(data_path: Path) -> dict[str, bytes]:
+    """Return the export as plain CSV bytes and each supported compressed form."""
+    raw = data_path.read_bytes()
+    variants = {".csv": raw, ".csv.gz": gzip.compress(raw, compresslevel=6)}
+
+    if zstd is not None:
+        variants[".csv.zst"] = zstd.compress(raw)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(data_path.name, raw)
+    variants[".zip"] = buffer.getvalue()
+
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark compressed upload formats against plain CSV."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--mbps",
+        type=float,
+        default=20.0,
+        help="Upload link speed in megabits per second",
+    )
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "compression.json")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {"mbps": args.mbps, "seed": args.seed, "repeat": args.repeat},
+        "sizes": {},
+    }
+    print(
+        f"{'rows':>12}  {'format':<10}{'MB':>10}{'ratio':>8}"
+        f"{'upload s':>10}{'parse s':>10}{'total s':>10}"
+    )
+
+    for n_rows in args.sizes:
+        data_path, _ = write_dataset(args.data_dir, n_rows, seed=args.seed)
+        variants = compressed_variants(data_path)
+        plain_size = len(variants[".csv"])
+        results["sizes"][str(n_rows)] = {}
+
+        for suffix, payload in variants.items():
+            _, timing = time_stage(
+                data_explorer.read_table, args.repeat, payload, f"export{suffix}"
+            )
+            upload = len(payload) * 8 / (args.mbps * 1e6)
+            entry = {
+                "bytes": len(payload),
+                "ratio": plain_size / len(payload),
+                "upload_s": upload,
+                "parse_s": timing["best"],
+                "total_s": upload + timing["best"],
+            }
+            results["sizes"][str(n_rows)][suffix] = entry
+            print(
+                f"{n_rows:>12,}  {suffix:<10}{len(payload) / 1e6:>10.1f}"
+                f"{entry['ratio']:>8.1f}"
+                f"{upload:>10.2f}{timing['best']:>10.3f}{entry['total_s']:>10.2f}"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+"""
+Seeded generator for synthetic appointment exports.
+
+Produces a data file matching the scheduling-system export read by
+`data_explorer.load_file` (see `SCHEMA_OVERRIDES`) and a matching reference
+file for the `type` join:
+
+    python -m benchmarks.generate --rows 100000 --seed 42 --out benchmarks/data
+"""
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+# -----------------------------
+# Vocabulary
+# -----------------------------
+FIRST_NAMES = [
+    "Olivia",
+    "Emma",
+    "Ava",
+    "Sophia",
+    "Isabella",
+    "Mia",
+    "Amelia",
+    "Harper",
+    "Evelyn",
+    "Abigail",
+    "Emily",
+    "Elizabeth",
+    "Sofia",
+    "Madison",
+    "Avery",
+    "Ella",
+    "Scarlett",
+    "Grace",
+    "Chloe",
+    "Victoria",
+    "Riley",
+    "Aria",
+    "Lily",
+    "Aubrey",
+    "Zoey",
+    "Penelope",
+    "Layla",
+    "Nora",
+    "Camila",
+    "Hannah",
+    "Maria",
+    "Ana",
+    "Jessica",
+    "Ashley",
+    "Sarah",
+    "Jennifer",
+    "Linh",
+    "Mai",
+    "Priya",
+    "Fatima",
+    "Yasmin",
+    "Gabriela",
+    "Julia",
+    "Laura",
+    "Nicole",
+    "Rachel",
+    "Megan",
+    "Lauren",
+    "Kayla",
+    "Samantha",
+]
+LAST_NAMES = [
+    "Smith",
+    "Johnson",
+    "Williams",
+    "Brown",
+    "Jones",
+    "Garcia",
+    "Miller",
+    "Davis",
+    "Rodriguez",
+    "Martinez",
+    "Hernandez",
+    "Lopez",
+    "Gonzalez",
+    "Wilson",
+    "Anderson",
+    "Thomas",
+    "Taylor",
+    "Moore",
+    "Jackson",
+    "Martin",
+    "Lee",
+    "Perez",
+    "Thompson",
+    "White",
+    "Harris",
+    "Sanchez",
+    "Clark",
+    "Ramirez",
+    "Lewis",
+    "Robinson",
+    "Walker",
+    "Young",
+    "Allen",
+    "King",
+    "Nguyen",
+    "Tran",
+    "Pham",
+    "Patel",
+    "Shah",
+    "Silva",
+    "Santos",
+    "Oliveira",
+    "O'Brien",
+    "Murphy",
+    "Sullivan",
+    "Kelly",
+    "Costa",
+    "Rossi",
+    "Kim",
+    "Park",
+]
+EMAIL_DOMAINS = [
+    "gmail.com",
+    "yahoo.com",
+    "hotmail.com",
+    "outlook.com",
+    "icloud.com",
+    "aol.com",
+]
+AREA_CODES = [617, 857, 781, 339, 978, 351, 508, 774, 603]
+CALENDARS = [
+    "Boston Studio",
+    "Cambridge Studio",
+    "Lowell Studio",
+    "Nashua Studio",
+    "Training Academy",
+]
+
+# Raw type name, price, duration (minutes), relative frequency
+APPOINTMENT_TYPES = [
+    ("Microblading", 650.0, 150, 14),
+    ("Microblading Touch Up", 150.0, 90, 10),
+    ("Nano Brows", 750.0, 150, 8),
+    ("Nano Brows Touch Up", 175.0, 90, 6),
+    ("Powder Brows", 700.0, 150, 9),
+    ("Powder Brows Touch Up", 175.0, 90, 6),
+    ("Combo Brows", 800.0, 180, 8),
+    ("Combo Brows Touch Up", 200.0, 90, 6),
+    ("Free Touch Up", 0.0, 60, 5),
+    ("Annual Color Refresh", 350.0, 90, 7),
+    ("Consultation", 0.0, 30, 8),
+    ("Lip Blush", 650.0, 150, 4),
+    ("Lip Blush Touch Up", 150.0, 90, 2),
+    ("PMU Training - 100 Hour", 4500.0, 480, 1),
+    ("Gift Certificate Session", 1200.0, 150, 1),
+    ("Brow Lamination", 95.0, 45, 5),
+]
+
+# Type, Include or not include, Revised Type, Initial / Touch up, Free Touch Up
+REFERENCE_ROWS = [
+    ("Microblading", "Yes", "Microblading", "Initial", "No"),
+    ("Microblading Touch Up", "Yes", "Microblading", "Touch Up", "No"),
+    ("Nano Brows", "Yes", "Nano Brows", "Initial", "No"),
+    ("Nano Brows Touch Up", "Yes", "Nano Brows", "Touch Up", "No"),
+    ("Powder Brows", "Yes", "Powder Brows", "Initial", "No"),
+    ("Powder Brows Touch Up", "Yes", "Powder Brows", "Touch Up", "No"),
+    ("Combo Brows", "Yes", "Combo Brows", "Initial", "No"),
+    ("Combo Brows Touch Up", "Yes", "Combo Brows", "Touch Up", "No"),
+    ("Free Touch Up", "Yes", "Touch Up", "Touch Up", "Yes"),
+    ("Annual Color Refresh", "Yes", "Color Refresh", "Touch Up", "No"),
+    ("Consultation", "No", "Consultation", None, "No"),
+    ("Lip Blush", "Yes", "Lip Blush", "Initial", "No"),
+    ("Lip Blush Touch Up", "Yes", "Lip Blush", "Touch Up", "No"),
+    ("PMU Training - 100 Hour", "No", "Training", None, "No"),
+    ("Gift Certificate Session", "Yes", "Microblading", "Initial", "No"),
+    # "Brow Lamination" is intentionally unmapped so it lands in "Needs Review"
+]
+
+EXPORT_TIME_FORMAT = "%B %d, %Y %I:%M %p"
+
+
+def _choice(rng: np.random.Generator, options: list, size: int, p=None) -> pl.Series:
+    """Pick `size` values from `options` as a Polars Series."""
+    idx = rng.choice(len(options), size=size, p=p)
+    return pl.Series(options).gather(idx)
+
+
+def _messy_case(col: str, codes: np.ndarray) -> pl.Expr:
+    """Randomly lower/upper-case a text column the way hand-typed entries are."""
+    return (
+        pl.when(pl.lit(pl.Series(codes)) == 1)
+        .then(pl.col(col).str.to_lowercase())
+        .when(pl.lit(pl.Series(codes)) == 2)
+        .then(pl.col(col).str.to_uppercase())
+        .otherwise(pl.col(col))
+        .alias(col)
+    )
+
+
+def calendar_names(n_calendars: int) -> list[str]:
+    """Return `n_calendars` calendar names, padding the studio list if needed."""
+    names = CALENDARS[:n_calendars]
+    names += [f"Artist {i:03d}" for i in range(len(names) + 1, n_calendars + 1)]
+    return names
+
+
+def generate_clients(
+    rng: np.random.Generator, n_clients: int, n_calendars: int
+) -> pl.DataFrame:
+    """Client pool with canonical names, phone digits, email and home calendar."""
+    first = _choice(rng, FIRST_NAMES, n_clients)
+    last = _choice(rng, LAST_NAMES, n_clients)
+    area = _choice(rng, AREA_CODES, n_clients)
+    local = pl.Series(rng.integers(2_000_000, 9_999_999, size=n_clients))
+
+    return (
+        pl.DataFrame(
+            {
+                "first_name": first,
+                "last_name": last,
+                "phone_digits": area.cast(pl.Utf8) + local.cast(pl.Utf8),
+                "domain": _choice(rng, EMAIL_DOMAINS, n_clients),
+                "email_suffix": pl.Series(rng.integers(1, 999, size=n_clients)),
+                "home_calendar": pl.Series(
+                    rng.integers(0, n_calendars, size=n_clients)
+                ),
+            }
+        )
+        .with_columns(
+            pl.concat_str(
+                [
+                    pl.col("first_name").str.to_lowercase(),
+                    pl.lit("."),
+                    pl.col("last_name").str.to_lowercase().str.replace_all("'", ""),
+                    pl.col("email_suffix").cast(pl.Utf8),
+                    pl.lit("@"),
+                    pl.col("domain"),
+                ]
+            ).alias("email")
+        )
+        .drop("domain", "email_suffix")
+    )
+
+
+def generate_appointments(
+    n_rows: int,
+    seed: int = 42,
+    n_calendars: int = len(CALENDARS),
+    start: datetime = datetime(2019, 1, 1),
+    end: datetime = datetime(2025, 12, 31),
+    typo_rate: float = 0.01,
+) -> pl.DataFrame:
+    """
+    Generate a raw appointment export with `n_rows` rows.
+
+    The output mirrors the scheduling-system CSV: "%B %d, %Y %I:%M %p" times,
+    comma-formatted prices, inconsistently formatted and cased contact details,
+    and repeat clients who sometimes book on a different calendar.
+    """
+    rng = np.random.default_rng(seed)
+    calendars = calendar_names(n_calendars)
+
+    # Skewed client pool: a few regulars, a long tail of one-off visits
+    n_clients = max(1, n_rows // 3)
+    clients = generate_clients(rng, n_clients, n_calendars)
+    n_regulars = max(1, n_clients // 10)
+    client_idx = np.where(
+        rng.random(n_rows) < 0.3,
+        rng.integers(0, n_regulars, size=n_rows),
+        rng.integers(0, n_clients, size=n_rows),
+    )
+    rows = clients[client_idx]
+
+    # Repeat clients occasionally visit another calendar
+    calendar_idx = rows["home_calendar"].to_numpy().copy()
+    switch = rng.random(n_rows) < 0.1
+    calendar_idx[switch] = rng.integers(0, n_calendars, size=int(switch.sum()))
+
+    # Appointment types, prices and durations
+    type_weights = np.array([t[3] for t in APPOINTMENT_TYPES], dtype=float)
+    type_idx = rng.choice(
+        len(APPOINTMENT_TYPES), size=n_rows, p=type_weights / type_weights.sum()
+    )
+    type_names = pl.Series([t[0] for t in APPOINTMENT_TYPES]).gather(type_idx)
+    prices = np.array([t[1] for t in APPOINTMENT_TYPES])[type_idx]
+    durations = np.array([t[2] for t in APPOINTMENT_TYPES])[type_idx]
+    price_text = pl.Series([f"{t[1]:,.2f}" for t in APPOINTMENT_TYPES]).gather(type_idx)
+
+    # Start times on 15-minute slots from 9:00 AM, finishing by 8:00 PM
+    n_days = (end - start).days + 1
+    day = rng.integers(0, n_days, size=n_rows)
+    slot = np.minimum(rng.integers(0, 36, size=n_rows), (11 * 60 - durations) // 15)
+    start_minutes = day * 24 * 60 + 9 * 60 + slot * 15
+    start_time = pl.lit(start) + pl.duration(minutes=pl.Series(start_minutes))
+    end_time = start_time + pl.duration(minutes=pl.Series(durations))
+
+    # Deposits paid online: none, a flat deposit, or the full price
+    paid_online = rng.choice(3, size=n_rows, p=[0.5, 0.35, 0.15])
+    deposit = (paid_online == 1) & (prices >= 100.0)
+
+    df = pl.DataFrame(
+        {
+            "First Name": rows["first_name"],
+            "Last Name": rows["last_name"],
+            "phone_digits": rows["phone_digits"],
+            "Email": rows["email"],
+            "Type": type_names,
+            "Calendar": pl.Series(calendars).gather(calendar_idx),
+            "Appointment Price": price_text,
+            "paid_online": pl.Series(paid_online),
+            "deposit": pl.Series(deposit),
+            "phone_format": pl.Series(
+                rng.choice(6, size=n_rows, p=[0.3, 0.25, 0.15, 0.1, 0.15, 0.05])
+            ),
+            "scheduled_days_before": pl.Series(rng.integers(0, 90, size=n_rows)),
+            "rescheduled": pl.Series(rng.random(n_rows) < 0.05),
+            "label_code": pl.Series(
+                rng.choice(4, size=n_rows, p=[0.85, 0.08, 0.05, 0.02])
+            ),
+            "paid": pl.Series(rng.random(n_rows) < 0.9),
+            "certificate": pl.Series(rng.random(n_rows) < 0.02),
+        }
+    ).with_columns(
+        start_time.alias("start_dt"),
+        end_time.alias("end_dt"),
+    )
+
+    # Hand-typed fields: inconsistent casing and the occasional dropped letter
+    first_typo = pl.Series(rng.random(n_rows) < typo_rate)
+    df = df.with_columns(
+        pl.when(pl.lit(first_typo))
+        .then(
+            pl.col("First Name").str.slice(0, pl.col("First Name").str.len_chars() - 1)
+        )
+        .otherwise(pl.col("First Name"))
+        .alias("First Name")
+    ).with_columns(
+        _messy_case("First Name", rng.choice(3, size=n_rows, p=[0.85, 0.1, 0.05])),
+        _messy_case("Last Name", rng.choice(3, size=n_rows, p=[0.85, 0.1, 0.05])),
+        _messy_case("Email", rng.choice(3, size=n_rows, p=[0.9, 0.0, 0.1])),
+        _messy_case("Type", rng.choice(3, size=n_rows, p=[0.9, 0.08, 0.02])),
+    )
+
+    # Phone numbers in every format a client might type, or missing
+    area = pl.col("phone_digits").str.slice(0, 3)
+    prefix = pl.col("phone_digits").str.slice(3, 3)
+    line = pl.col("phone_digits").str.slice(6, 4)
+    fmt = pl.col("phone_format")
+    phone = (
+        pl.when(fmt == 0)
+        .then(
+            pl.concat_str([pl.lit("("), area, pl.lit(") "), prefix, pl.lit("-"), line])
+        )
+        .when(fmt == 1)
+        .then(pl.concat_str([area, pl.lit("-"), prefix, pl.lit("-"), line]))
+        .when(fmt == 2)
+        .then(
+            pl.concat_str([pl.lit("+1 "), area, pl.lit("-"), prefix, pl.lit("-"), line])
+        )
+        .when(fmt == 3)
+        .then(pl.concat_str([area, pl.lit("."), prefix, pl.lit("."), line]))
+        .when(fmt == 4)
+        .then(pl.col("phone_digits"))
+        .otherwise(None)
+    )
+
+    df = df.sort("start_dt").with_columns(
+        pl.col("start_dt").dt.strftime(EXPORT_TIME_FORMAT).alias("Start Time"),
+        pl.col("end_dt").dt.strftime(EXPORT_TIME_FORMAT).alias("End Time"),
+        phone.alias("Phone"),
+        pl.when(pl.col("paid"))
+        .then(pl.lit("yes"))
+        .otherwise(pl.lit("no"))
+        .alias("Paid?"),
+        pl.when(pl.col("paid_online") == 0)
+        .then(pl.lit("0.00"))
+        .when(pl.col("deposit"))
+        .then(pl.lit("100.00"))
+        .otherwise(pl.col("Appointment Price"))
+        .alias("Amount Paid Online"),
+        pl.when(pl.col("certificate"))
+        .then(
+            pl.concat_str(
+                [
+                    pl.lit("GC"),
+                    (pl.int_range(pl.len()) * 7919 % 1_000_000).cast(pl.Utf8),
+                ]
+            )
+        )
+        .otherwise(None)
+        .alias("Certificate Code"),
+        (pl.col("start_dt") - pl.duration(days=pl.col("scheduled_days_before")))
+        .dt.strftime("%Y-%m-%d")
+        .alias("Date Scheduled"),
+        pl.when(pl.col("label_code") == 1)
+        .then(pl.lit("checked in"))
+        .when(pl.col("label_code") == 2)
+        .then(pl.lit("NO SHOW"))
+        .when(pl.col("label_code") == 3)
+        .then(pl.lit("Late Cancel"))
+        .otherwise(None)
+        .alias("Label"),
+        pl.when(pl.col("rescheduled"))
+        .then(
+            (
+                pl.col("start_dt")
+                - pl.duration(days=pl.col("scheduled_days_before") // 2)
+            ).dt.strftime("%Y-%m-%d")
+        )
+        .otherwise(None)
+        .alias("Date Rescheduled"),
+        (pl.int_range(pl.len(), dtype=pl.Int64) + 100_000_000).alias("Appointment ID"),
+    )
+
+    return df.select(
+        [
+            "Start Time",
+            "End Time",
+            "First Name",
+            "Last Name",
+            "Phone",
+            "Email",
+            "Type",
+            "Calendar",
+            "Appointment Price",
+            "Paid?",
+            "Amount Paid Online",
+            "Certificate Code",
+            "Date Scheduled",
+            "Label",
+            "Date Rescheduled",
+            "Appointment ID",
+        ]
+    )
+
+
+def generate_references() -> pl.DataFrame:
+    """Generate the reference mapping file matching `APPOINTMENT_TYPES`."""
+    return pl.DataFrame(
+        REFERENCE_ROWS,
+        schema=[
+            "Type",
+            "Include or not include",
+            "Revised Type",
+            "Initial / Touch up",
+            "Free Touch Up",
+        ],
+        orient="row",
+    )
+
+
+def dataset_paths(out_dir: Path, n_rows: int, seed: int) -> tuple[Path, Path]:
+    """Return the data and reference file paths for a generated dataset."""
+    out_dir = Path(out_dir)
+    return (
+        out_dir / f"appointments_{n_rows}_seed{seed}.csv",
+        out_dir / "references.csv",
+    )
+
+
+def write_dataset(
+    out_dir: Path, n_rows: int, seed: int = 42, overwrite: bool = False
+) -> tuple[Path, Path]:
+    """Write a generated data file and its reference file, reusing existing files."""
+    data_path, references_path = dataset_paths(out_dir, n_rows, seed)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if overwrite or not data_path.exists():
+        generate_appointments(n_rows, seed=seed).write_csv(data_path)
+    if overwrite or not references_path.exists():
+        generate_references().write_csv(references_path)
+
+    return data_path, references_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic appointment exports."
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000], help="Row counts to generate"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, default=Path(__file__).parent / "data")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        data_path, references_path = write_dataset(
+            args.out, n_rows, seed=args.seed, overwrite=args.overwrite
+        )
+        print(f"{n_rows:>12,} rows -> {data_path} ({references_path.name})")
+
+
+if __name__ == "__main__":
+    main()
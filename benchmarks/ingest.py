@@ -0,0 +1,85 @@
+"""
+Directory ingestion benchmark: CSV parse vs. the Arrow IPC cache.
+
+Times `data_explorer.read_table` plus `data_explorer.clean_data` on the raw
+export, the cold `data_explorer.ingest_files` run that builds the cache of
+cleaned frames, and warm runs that memory-map it:
+
+    python -m benchmarks.ingest --sizes 1000000 10000000
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import data_explorer
+from benchmarks.generate import write_dataset
+from benchmarks.run import DATA_DIR, RESULTS_DIR, time_stage
+
+
+def parse_and_clean(data_path: Path):
+    """What the app does without the cache: parse the export, then clean it."""
+    return data_explorer.clean_data(data_explorer.read_table(data_path, data_path.name))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark directory ingestion through the Arrow IPC cache."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "ingest.json")
+    args = parser.parse_args()
+
+    results = {"meta": {"seed": args.seed, "repeat": args.repeat}, "sizes": {}}
+    print(
+        f"{'rows':>12}{'parse+clean s':>15}{'cold ingest s':>16}"
+        f"{'warm ingest s':>16}{'speedup':>10}"
+    )
+
+    for n_rows in args.sizes:
+        data_path, _ = write_dataset(args.data_dir, n_rows, seed=args.seed)
+
+        _, parse = time_stage(parse_and_clean, args.repeat, data_path)
+
+        cache_dir = Path(tempfile.mkdtemp(prefix="data_explorer_ipc_"))
+        try:
+            _, cold = time_stage(
+                data_explorer.ingest_files,
+                1,
+                [data_path],
+                cache_dir,
+                data_explorer.clean_data,
+            )
+            _, warm = time_stage(
+                data_explorer.ingest_files,
+                args.repeat,
+                [data_path],
+                cache_dir,
+                data_explorer.clean_data,
+            )
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        speedup = parse["best"] / warm["best"]
+        results["sizes"][str(n_rows)] = {
+            "parse_clean_s": parse["best"],
+            "cold_ingest_s": cold["best"],
+            "warm_ingest_s": warm["best"],
+            "speedup": speedup,
+        }
+        print(
+            f"{n_rows:>12,}{parse['best']:>15.3f}{cold['best']:>16.3f}{warm['best']:>16.4f}{speedup:>9.0f}x"
+        )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
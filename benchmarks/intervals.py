@@ -0,0 +1,122 @@
+"""
+Calendar interval sweep benchmark.
+
+Generates a year of appointments spread over many calendars and times
+`data_explorer.sweep_intervals`, `data_explorer.concurrency_peaks` and
+`data_explorer.calendar_utilization`. For smaller sizes the sweep's
+double-booking flags are also checked against, and timed with, a pairwise
+self-join on calendar:
+
+    python -m benchmarks.intervals --sizes 100000 1000000 --calendars 200
+"""
+
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+import polars as pl
+
+import data_explorer
+from benchmarks.generate import generate_appointments
+from benchmarks.run import RESULTS_DIR, time_stage
+
+
+def pairwise_double_booked(df: pl.DataFrame) -> pl.DataFrame:
+    """Quadratic baseline: compare every pair of appointments on a calendar."""
+    rows = df.select("calendar", "start_time", "end_time").with_row_index("row")
+    overlaps = (
+        rows.join(rows, on="calendar", suffix="_other")
+        .filter(
+            (pl.col("row") != pl.col("row_other"))
+            & (pl.col("start_time") < pl.col("end_time_other"))
+            & (pl.col("start_time_other") < pl.col("end_time"))
+        )
+        .select("row")
+        .unique()
+    )
+    return rows.with_columns(
+        pl.col("row").is_in(overlaps["row"].implode()).alias("double_booked")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the calendar interval sweep."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--calendars", type=int, default=200)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument(
+        "--pairwise-max",
+        type=int,
+        default=20_000,
+        help="Largest size to run the pairwise baseline on",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "intervals.json")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "calendars": args.calendars,
+            "year": args.year,
+        },
+        "sizes": {},
+    }
+    print(
+        f"{'rows':>12}{'sweep s':>10}{'peaks s':>10}{'weekly s':>10}"
+        f"{'pairwise s':>12}{'double booked':>15}"
+    )
+
+    for n_rows in args.sizes:
+        raw = generate_appointments(
+            n_rows,
+            seed=args.seed,
+            n_calendars=args.calendars,
+            start=datetime(args.year, 1, 1),
+            end=datetime(args.year, 12, 31),
+        )
+        df = data_explorer.clean_data(raw)
+
+        intervals, sweep = time_stage(data_explorer.sweep_intervals, args.repeat, df)
+        _, peaks = time_stage(data_explorer.concurrency_peaks, args.repeat, intervals)
+        _, weekly = time_stage(
+            data_explorer.calendar_utilization, args.repeat, intervals, "Week"
+        )
+
+        entry = {
+            "sweep_s": sweep["best"],
+            "peaks_s": peaks["best"],
+            "weekly_utilization_s": weekly["best"],
+            "double_booked": int(intervals["double_booked"].sum()),
+        }
+
+        if n_rows <= args.pairwise_max:
+            baseline, pairwise = time_stage(pairwise_double_booked, 1, intervals)
+            entry["pairwise_s"] = pairwise["best"]
+            entry["matches_pairwise"] = baseline["double_booked"].equals(
+                intervals["double_booked"]
+            )
+
+        results["sizes"][str(n_rows)] = entry
+        pairwise_text = (
+            f"{entry['pairwise_s']:>12.4f}" if "pairwise_s" in entry else f"{'-':>12}"
+        )
+        print(
+            f"{n_rows:>12,}{entry['sweep_s']:>10.4f}{entry['peaks_s']:>10.4f}"
+            f"{entry['weekly_utilization_s']:>10.4f}{pairwise_text}{entry['double_booked']:>15,}"
+        )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
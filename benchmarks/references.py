@@ -0,0 +1,110 @@
+"""
+Reference store benchmark.
+
+Times compiling a reference file into the store (cold) against reading the
+stored version back (warm), the previous hash join on `type` against the
+Enum-encoded lookup in `data_explorer.join_references`, and diffing two
+reference versions:
+
+    python -m benchmarks.references --sizes 1000000 10000000
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import polars as pl
+
+import data_explorer
+from benchmarks.generate import write_dataset
+from benchmarks.run import DATA_DIR, RESULTS_DIR, time_stage
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the compiled reference store and join."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "references.json")
+    args = parser.parse_args()
+
+    results = {"meta": {"seed": args.seed, "repeat": args.repeat}, "sizes": {}}
+    print(
+        f"{'rows':>12}{'cold s':>10}{'warm s':>10}{'hash join s':>13}"
+        f"{'lookup s':>10}{'speedup':>9}{'diff ms':>9}"
+    )
+
+    for n_rows in args.sizes:
+        data_path, references_path = write_dataset(
+            args.data_dir, n_rows, seed=args.seed
+        )
+        df_data_clean = data_explorer.clean_data(
+            data_explorer.read_table(data_path, data_path.name)
+        )
+        df_references = data_explorer.read_table(references_path, references_path.name)
+
+        store_dir = Path(tempfile.mkdtemp(prefix="data_explorer_references_"))
+        try:
+            (references, _), cold = time_stage(
+                data_explorer.store_references, 1, df_references, store_dir
+            )
+            _, warm = time_stage(
+                data_explorer.store_references, args.repeat, df_references, store_dir
+            )
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+        df_references_clean = data_explorer.clean_references(df_references)
+        _, hash_join = time_stage(
+            df_data_clean.join, args.repeat, df_references_clean, on="type", how="left"
+        )
+        _, lookup = time_stage(
+            data_explorer.join_references, args.repeat, df_data_clean, references
+        )
+
+        # A second version with one remapped and one added type
+        remapped = references.with_columns(pl.col("type").cast(pl.Utf8)).with_columns(
+            pl.when(pl.col("type") == pl.col("type").first())
+            .then(pl.lit("Remapped"))
+            .otherwise(pl.col("revised_type"))
+            .alias("revised_type")
+        )
+        updated = data_explorer.compile_references(
+            pl.concat(
+                [
+                    remapped,
+                    remapped.head(1).with_columns(pl.lit("Added Type").alias("type")),
+                ]
+            )
+        )
+        _, diff = time_stage(
+            data_explorer.diff_references, args.repeat, references, updated
+        )
+
+        entry = {
+            "cold_s": cold["best"],
+            "warm_s": warm["best"],
+            "hash_join_s": hash_join["best"],
+            "lookup_s": lookup["best"],
+            "speedup": hash_join["best"] / lookup["best"],
+            "diff_s": diff["best"],
+        }
+        results["sizes"][str(n_rows)] = entry
+        print(
+            f"{n_rows:>12,}{entry['cold_s']:>10.4f}{entry['warm_s']:>10.4f}"
+            f"{entry['hash_join_s']:>13.4f}{entry['lookup_s']:>10.4f}"
+            f"{entry['speedup']:>8.1f}x{entry['diff_s'] * 1e3:>9.2f}"
+        )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
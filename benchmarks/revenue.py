@@ -0,0 +1,130 @@
+"""
+Revenue cube benchmark.
+
+Times `data_explorer.build_revenue_cube` and `data_explorer.client_lifetime_value`
+on the included appointments, then compares answering dashboard slices from
+the cube with `data_explorer.slice_revenue` against rescanning the rows:
+
+    python -m benchmarks.revenue --sizes 1000000 10000000
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import polars as pl
+
+import data_explorer
+from benchmarks.generate import write_dataset
+from benchmarks.run import (
+    DATA_DIR,
+    DEFAULT_GROUP_BY,
+    DEFAULT_INCLUDE,
+    RESULTS_DIR,
+    time_stage,
+)
+
+# Slices the dashboard asks for: (slice by, calendar filter)
+SLICES = {
+    "total": ([], []),
+    "by_month": (["month"], []),
+    "by_type_one_calendar": (["revised_type"], ["Boston Studio"]),
+    "by_initial_touch_up": (["initial_touch_up"], []),
+}
+
+
+def prepare_included(data_path: Path, references_path: Path) -> pl.DataFrame:
+    """Run the pipeline up to the identity-resolved, included appointments."""
+    df = data_explorer.join_references(
+        data_explorer.clean_data(data_explorer.read_table(data_path, data_path.name)),
+        data_explorer.compile_references(
+            data_explorer.clean_references(
+                data_explorer.read_table(references_path, references_path.name)
+            )
+        ),
+    )
+    df = data_explorer.resolve_identities(df)
+    return df.filter(data_explorer.include_filter(DEFAULT_INCLUDE))
+
+
+def scan_slice(df: pl.DataFrame, by: list[str], calendars: list[str]) -> pl.DataFrame:
+    """The same slice computed directly from appointment rows."""
+    if calendars:
+        df = df.filter(pl.col("calendar").is_in(calendars))
+    df = df.with_columns(
+        pl.col("start_time").dt.truncate("1mo").dt.date().alias("month")
+    )
+    aggs = [
+        pl.len().alias("appointments"),
+        pl.col("appointment_price").sum().alias("price_sum"),
+        pl.col("appointment_price").mean().alias("price_mean"),
+        pl.col("amount_paid_online").sum().alias("paid_online_sum"),
+        pl.col("amount_paid_online").mean().alias("paid_online_mean"),
+    ]
+    return df.group_by(by).agg(aggs) if by else df.select(aggs)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the revenue cube against row scans."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "revenue.json")
+    args = parser.parse_args()
+
+    results = {"meta": {"seed": args.seed, "repeat": args.repeat}, "sizes": {}}
+
+    for n_rows in args.sizes:
+        data_path, references_path = write_dataset(
+            args.data_dir, n_rows, seed=args.seed
+        )
+        df = prepare_included(data_path, references_path)
+
+        cube, build = time_stage(data_explorer.build_revenue_cube, args.repeat, df)
+        _, lifetime = time_stage(
+            data_explorer.client_lifetime_value, args.repeat, df, DEFAULT_GROUP_BY
+        )
+
+        entry = {
+            "rows": df.height,
+            "cube_cells": cube.height,
+            "cube_bytes": cube.estimated_size(),
+            "build_s": build["best"],
+            "lifetime_value_s": lifetime["best"],
+            "slices": {},
+        }
+        print(
+            f"{n_rows:>12,} rows  cube={cube.height:,} cells "
+            f"({cube.estimated_size() / 1e3:.0f} kB)  "
+            f"build={build['best']:.4f}s  lifetime_value={lifetime['best']:.4f}s"
+        )
+
+        for name, (by, calendars) in SLICES.items():
+            filters = {"calendar": calendars}
+            _, from_cube = time_stage(
+                data_explorer.slice_revenue, args.repeat, cube, by, filters
+            )
+            _, from_rows = time_stage(scan_slice, args.repeat, df, by, calendars)
+            entry["slices"][name] = {
+                "cube_ms": from_cube["best"] * 1e3,
+                "scan_ms": from_rows["best"] * 1e3,
+                "speedup": from_rows["best"] / from_cube["best"],
+            }
+            print(
+                f"{'':>14}{name:<22}cube={from_cube['best'] * 1e3:>8.2f}ms  "
+                f"scan={from_rows['best'] * 1e3:>8.2f}ms  "
+                f"{from_rows['best'] / from_cube['best']:>6.0f}x"
+            )
+
+        results["sizes"][str(n_rows)] = entry
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
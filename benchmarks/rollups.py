@@ -0,0 +1,113 @@
+"""
+Appointment volume rollup benchmark.
+
+Times `data_explorer.build_rollups` on the windowed result, compares folding
+a new batch in with `data_explorer.update_rollups` against rebuilding from
+scratch, and reports the rows and Arrow chart payload bytes at each level:
+
+    python -m benchmarks.rollups --sizes 100000 1000000 --batch 0.05
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import data_explorer
+from benchmarks.generate import write_dataset
+from benchmarks.run import (
+    DATA_DIR,
+    DEFAULT_GROUP_BY,
+    DEFAULT_INCLUDE,
+    RESULTS_DIR,
+    time_stage,
+)
+
+
+def prepare_result(data_path: Path, references_path: Path):
+    """Run the pipeline up to the windowed result the dashboard charts."""
+    df = data_explorer.join_references(
+        data_explorer.clean_data(data_explorer.read_table(data_path, data_path.name)),
+        data_explorer.compile_references(
+            data_explorer.clean_references(
+                data_explorer.read_table(references_path, references_path.name)
+            )
+        ),
+    )
+    df = data_explorer.resolve_identities(df)
+    return data_explorer.build_result(df, DEFAULT_GROUP_BY, DEFAULT_INCLUDE)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark appointment volume rollups."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--batch",
+        type=float,
+        default=0.05,
+        help="Share of rows appended as a new batch",
+    )
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "rollups.json")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {"seed": args.seed, "repeat": args.repeat, "batch": args.batch},
+        "sizes": {},
+    }
+
+    for n_rows in args.sizes:
+        data_path, references_path = write_dataset(
+            args.data_dir, n_rows, seed=args.seed
+        )
+        result = prepare_result(data_path, references_path).sort("start_time")
+
+        rollups, build = time_stage(data_explorer.build_rollups, args.repeat, result)
+
+        split = int(result.height * (1 - args.batch))
+        existing, appended = result[:split], result[split:]
+        previous = data_explorer.build_rollups(existing)
+        _, update = time_stage(
+            data_explorer.update_rollups, args.repeat, previous, appended
+        )
+
+        levels = {}
+        for level, frame in rollups.items():
+            # Chart data travels to the browser as Arrow IPC
+            volume = data_explorer.volume_data(frame, "calendar")
+            levels[level] = {
+                "rows": frame.height,
+                "periods": frame["period_start"].n_unique(),
+                "payload_bytes": len(volume.write_ipc(None).getvalue()),
+            }
+
+        results["sizes"][str(n_rows)] = {
+            "result_rows": result.height,
+            "build_s": build["best"],
+            "update_s": update["best"],
+            "auto_level": data_explorer.pick_rollup_level(rollups),
+            "levels": levels,
+        }
+
+        print(
+            f"{n_rows:>12,} rows  build={build['best']:.4f}s  "
+            f"update({appended.height:,} rows)={update['best']:.4f}s  "
+            f"auto={results['sizes'][str(n_rows)]['auto_level']}"
+        )
+        for level, entry in levels.items():
+            print(
+                f"{'':>14}{level:<6}{entry['rows']:>10,} rows"
+                f"{entry['periods']:>8,} periods"
+                f"{entry['payload_bytes'] / 1e3:>10.1f} kB"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
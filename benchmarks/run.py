@@ -0,0 +1,212 @@
+"""
+Stage-by-stage benchmarks for the data explorer pipeline.
+
+Times each stage of `data_explorer` on generated exports and stores the
+results as JSON so runs can be compared for regressions:
+
+    python -m benchmarks.run --sizes 10000 100000 \
+        --output benchmarks/results/latest.json
+    python -m benchmarks.run --sizes 10000 100000 \
+        --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import polars as pl
+
+import data_explorer
+from benchmarks.generate import write_dataset
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_GROUP_BY = ["client_id"]
+DEFAULT_INCLUDE = "Yes"
+DATA_DIR = Path(__file__).parent / "data"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def time_stage(fn, repeat: int, *args, **kwargs):
+    """
+    Run `fn(*args, **kwargs)` `repeat` times; return its last output and the
+    timings in seconds.
+    """
+    timings = []
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return output, {
+        "best": min(timings),
+        "mean": statistics.fmean(timings),
+        "runs": timings,
+    }
+
+
+def run_pipeline(data_path: Path, references_path: Path, repeat: int) -> dict:
+    """Benchmark every pipeline stage on one generated dataset."""
+    # Mirror the upload widget: the file arrives as bytes already in memory
+    data_bytes = data_path.read_bytes()
+    references_bytes = references_path.read_bytes()
+    stages = {}
+
+    (df_data, df_references), stages["load"] = time_stage(
+        lambda: (
+            data_explorer.read_table(data_bytes, data_path.name),
+            data_explorer.read_table(references_bytes, references_path.name),
+        ),
+        repeat,
+    )
+
+    (df_data_clean, df_references_clean), stages["clean"] = time_stage(
+        lambda: (
+            data_explorer.clean_data(df_data),
+            data_explorer.compile_references(
+                data_explorer.clean_references(df_references)
+            ),
+        ),
+        repeat,
+    )
+
+    df_joined, stages["join"] = time_stage(
+        lambda: data_explorer.join_references(df_data_clean, df_references_clean),
+        repeat,
+    )
+
+    df, stages["identity"] = time_stage(
+        lambda: data_explorer.resolve_identities(df_joined),
+        repeat,
+    )
+
+    result, stages["window"] = time_stage(
+        lambda: data_explorer.build_result(df, DEFAULT_GROUP_BY, DEFAULT_INCLUDE),
+        repeat,
+    )
+
+    (_, kpis), stages["aggregates"] = time_stage(
+        lambda: (
+            data_explorer.count_records_status(df),
+            data_explorer.compute_kpis(result),
+        ),
+        repeat,
+    )
+
+    _, stages["charts"] = time_stage(
+        lambda: data_explorer.histogram_chart(
+            data_explorer.histogram_data(result, kpis["avg_appointments"])
+        ).to_dict(),
+        repeat,
+    )
+
+    return {
+        "file_bytes": len(data_bytes),
+        "rows_in": df_data.height,
+        "rows_out": result.height,
+        "clients": df["client_id"].n_unique(),
+        "stages": stages,
+        "total": sum(stage["best"] for stage in stages.values()),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a stage-by-stage comparison and return the regressed stages."""
+    regressions = []
+    print(f"\n{'rows':>12}  {'stage':<12}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for size, run in current["sizes"].items():
+        base_run = baseline["sizes"].get(size)
+        if base_run is None:
+            continue
+        for stage, timing in run["stages"].items():
+            base_timing = base_run["stages"].get(stage)
+            if base_timing is None:
+                continue
+            ratio = (
+                timing["best"] / base_timing["best"]
+                if base_timing["best"]
+                else float("inf")
+            )
+            flag = "  <-- regression" if ratio > threshold else ""
+            print(
+                f"{int(size):>12,}  {stage:<12}{base_timing['best']:>12.4f}"
+                f"{timing['best']:>12.4f}{ratio:>8.2f}{flag}"
+            )
+            if flag:
+                regressions.append(f"{size}/{stage}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the data explorer pipeline stage by stage."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Row counts to benchmark",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per stage; the best run is reported"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "latest.json")
+    parser.add_argument(
+        "--compare", type=Path, help="Baseline results JSON to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Slowdown ratio reported as a regression",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "polars": pl.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "group_by": DEFAULT_GROUP_BY,
+        },
+        "sizes": {},
+    }
+
+    for n_rows in args.sizes:
+        data_path, references_path = write_dataset(
+            args.data_dir, n_rows, seed=args.seed
+        )
+        run = run_pipeline(data_path, references_path, args.repeat)
+        results["sizes"][str(n_rows)] = run
+
+        timings = "  ".join(
+            f"{stage}={timing['best']:.4f}s" for stage, timing in run["stages"].items()
+        )
+        print(f"{n_rows:>12,} rows  {timings}  total={run['total']:.4f}s")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(
+                f"\nRegressions above {args.threshold:.2f}x: {', '.join(regressions)}"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
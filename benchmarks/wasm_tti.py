@@ -0,0 +1,155 @@
+"""
+Time-to-interactive harness for the static WebAssembly build in `docs/`.
+
+Serves the export locally, opens it in headless Chromium and measures how
+long it takes until the upload widget is on the page, together with the
+bytes downloaded and the Python packages Pyodide loaded:
+
+    pip install playwright && playwright install chromium
+    python -m benchmarks.wasm_tti --site docs --runs 3
+
+Pyodide and its packages are fetched from the public CDN, so the page needs
+network access even though the export itself is served locally.
+"""
+
+import argparse
+import functools
+import json
+import statistics
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmarks.run import RESULTS_DIR
+
+SITE_DIR = Path(__file__).parent.parent / "docs"
+READY_SELECTOR = "input[type=file]"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        ".js": "application/javascript",
+        ".wasm": "application/wasm",
+    }
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(site: Path) -> ThreadingHTTPServer:
+    """Serve `site` on a free local port in a background thread."""
+    handler = functools.partial(QuietHandler, directory=str(site))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(browser, url: str, timeout_s: float) -> dict:
+    """Load `url` in a fresh browser context; time until the upload widget appears."""
+    context = browser.new_context()
+    page = context.new_page()
+    downloaded = {"bytes": 0, "requests": 0}
+    packages = []
+
+    def on_request_finished(request):
+        downloaded["requests"] += 1
+        downloaded["bytes"] += request.sizes()["responseBodySize"]
+
+    def on_console(message):
+        # Pyodide and micropip report what they install on the console
+        if message.text.startswith(("Loading ", "Loaded ", "Loading from micropip")):
+            packages.append(message.text)
+
+    page.on("requestfinished", on_request_finished)
+    page.on("console", on_console)
+
+    start = time.perf_counter()
+    page.goto(url)
+    page.locator(READY_SELECTOR).first.wait_for(
+        state="attached", timeout=timeout_s * 1000
+    )
+    elapsed = time.perf_counter() - start
+
+    context.close()
+    return {
+        "time_to_interactive_s": elapsed,
+        "requests": downloaded["requests"],
+        "bytes": downloaded["bytes"],
+        "packages": packages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure time-to-interactive of the WebAssembly export."
+    )
+    parser.add_argument(
+        "--site",
+        type=Path,
+        default=SITE_DIR,
+        help="Directory holding the exported index.html",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="Cold loads, each in a fresh browser context",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=180.0,
+        help="Seconds to wait for the upload widget",
+    )
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "wasm_tti.json")
+    args = parser.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError as err:
+        raise SystemExit(
+            "playwright is required: "
+            "pip install playwright && playwright install chromium"
+        ) from err
+
+    server = serve(args.site)
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+
+    runs = []
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=True)
+            for i in range(args.runs):
+                run = measure(browser, url, args.timeout)
+                runs.append(run)
+                print(
+                    f"run {i + 1}: {run['time_to_interactive_s']:.2f}s  "
+                    f"{run['requests']} requests  {run['bytes'] / 1e6:.1f} MB"
+                )
+            browser.close()
+    finally:
+        server.shutdown()
+
+    timings = [run["time_to_interactive_s"] for run in runs]
+    results = {
+        "meta": {"site": str(args.site), "runs": args.runs},
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+        "runs": runs,
+    }
+    print(
+        f"\ntime to interactive: best {results['best_s']:.2f}s, "
+        f"median {results['median_s']:.2f}s"
+    )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
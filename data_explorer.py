@@ -6,14 +6,107 @@ app = marimo.App(width="full", app_title="Brow Lady Microblading Studio")
 with app.setup:
     # Initialization code that runs before all other cells
     import marimo as mo
-    import polars as pl
     import os
     import re
     import io
-    import altair as alt
+    import sys
+    import json
+    import time
+    import types
+    import zipfile
+    import hashlib
+    import importlib.util
+    from collections import OrderedDict, deque
     from datetime import datetime
+    from pathlib import Path
     from zoneinfo import ZoneInfo
 
+    try:
+        import resource
+    except ImportError:  # Windows and WebAssembly builds
+        resource = None
+
+    class LazyModule(types.ModuleType):
+        """Module that is imported on first attribute access."""
+
+        def __getattr__(self, name: str):
+            module = importlib.import_module(self.__name__)
+            self.__dict__.update(module.__dict__)
+            return getattr(module, name)
+
+    # The WebAssembly build installs every statically imported package before
+    # the first cell runs, so Polars is bound lazily and installed by a cell
+    # placed after the header and upload widgets (see `load_package`)
+    pl = LazyModule("polars")
+
+    # -----------------------------
+    # Configuration
+    # -----------------------------
+    SCHEMA_OVERRIDES = {
+        "Start Time": str,
+        "End Time": str,
+        "Phone": str,
+        "Appointment Price": str,
+        "Amount Paid Online": str,
+        "Certificate Code": str,
+        "Date Scheduled": str,
+        "Label": str,
+        "Date Rescheduled": str,
+        "Appointment ID": int,
+    }
+
+    # Upload types: plain or compressed CSV (gzip, zstd, zip of CSVs) and Excel
+    SUPPORTED_FILETYPES = [".csv", ".csv.gz", ".csv.zst", ".zip", ".xlsx"]
+
+    # Zip members are decompressed and parsed this many bytes at a time
+    CSV_BLOCK_BYTES = 8 * 1024**2
+
+    # Appointment volume rollups: breakdown columns and period lengths
+    ROLLUP_KEYS = ["calendar", "revised_type"]
+    ROLLUP_EVERY = {"Day": "1d", "Week": "1w", "Month": "1mo"}
+
+    # Chart specs keyed by chart builder, data digest and arguments, least
+    # recently used first
+    CHART_CACHE = OrderedDict()
+    CHART_CACHE_SIZE = 32
+
+    # Calendar utilization: bookable hours per calendar per open day (9am-8pm),
+    # the ISO weekdays calendars are open (1 = Monday ... 7 = Sunday)
+    # and the periods utilization is reported over
+    OPEN_HOURS_PER_DAY = 11
+    OPEN_WEEKDAYS = [1, 2, 3, 4, 5, 6, 7]
+    UTILIZATION_EVERY = {"Day": "1d", "Week": "1w", "Month": "1mo"}
+
+    # Revenue cube dimensions, coarsest time grain is one month
+    REVENUE_KEYS = ["calendar", "revised_type", "initial_touch_up", "month"]
+
+    # Server-side ingestion (on-prem): read exports from directories instead of
+    # uploads, caching each file as Arrow IPC so warm runs memory-map it
+    DATA_DIR = os.environ.get("DATA_EXPLORER_DATA_DIR")
+    REFERENCES_DIR = os.environ.get("DATA_EXPLORER_REFERENCES_DIR")
+    IPC_CACHE_DIR = Path(
+        os.environ.get("DATA_EXPLORER_CACHE_DIR", Path.home() / ".cache" / "data_explorer")
+    )
+    INGEST_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".zip", ".xls", ".xlsx")
+    # Bump when cached output changes (e.g. clean_data), so old entries are rebuilt
+    INGEST_CACHE_VERSION = 1
+    # Files modified more recently than this must keep their size and mtime
+    # for this long before they are read, so half-written exports are skipped
+    INGEST_SETTLE_SECONDS = 2.0
+
+    # Compiled reference mappings, one Arrow IPC file per version plus an index
+    REFERENCE_STORE_DIR = IPC_CACHE_DIR / "references"
+
+    # -----------------------------
+    # Instrumentation
+    # -----------------------------
+    # Enabled in edit mode or with DATA_EXPLORER_TRACE=1; when disabled,
+    # traced_call is a single dictionary lookup before calling through.
+    TRACE = {
+        "enabled": mo.app_meta().mode == "edit" or os.environ.get("DATA_EXPLORER_TRACE") == "1",
+        "events": deque(maxlen=2000),
+    }
+
 
 @app.cell
 def _():
@@ -104,7 +197,7 @@ def _():
     # File Upload for Data
     # -----------------------------
     # File upload widget
-    file_upload_data = mo.ui.file(kind="area", filetypes=[".csv", ".xlsx"], multiple=False, label="Data File:<br> Drag and drop file here or click to open file browser")
+    file_upload_data = mo.ui.file(kind="area", filetypes=SUPPORTED_FILETYPES, multiple=False, label="Data File:<br> Drag and drop file here or click to open file browser")
     return (file_upload_data,)
 
 
@@ -115,14 +208,36 @@ def _():
     # File Upload for References/Mappings
     # -----------------------------
     # File upload widget
-    file_upload_references = mo.ui.file(kind="area", filetypes=[".csv", ".xlsx"], multiple=False, label="Reference File for Mappings:<br> Drag and drop file here or click to open file browser")
+    file_upload_references = mo.ui.file(kind="area", filetypes=SUPPORTED_FILETYPES, multiple=False, label="Reference File for Mappings:<br> Drag and drop file here or click to open file browser")
     return (file_upload_references,)
 
 
+@app.cell
+def _():
+    # -----------------------------
+    # Server-side Directories
+    # -----------------------------
+    # The loaders re-run once files added, removed or rewritten in a directory
+    # have settled
+    get_data_files, set_data_files = mo.state(directory_signature(Path(DATA_DIR)) if DATA_DIR else None)
+    get_references_files, set_references_files = mo.state(
+        directory_signature(Path(REFERENCES_DIR)) if REFERENCES_DIR else None
+    )
+    if DATA_DIR:
+        watch_directory(Path(DATA_DIR), get_data_files(), set_data_files)
+    if REFERENCES_DIR:
+        watch_directory(Path(REFERENCES_DIR), get_references_files(), set_references_files)
+    return get_data_files, get_references_files
+
+
 @app.cell
 def _(file_upload_data, file_upload_references):
     grid = mo.hstack(
-                [file_upload_data, file_upload_references], justify="center"
+                [
+                    mo.md(f"Data directory:<br>`{DATA_DIR}`") if DATA_DIR else file_upload_data,
+                    mo.md(f"Reference directory:<br>`{REFERENCES_DIR}`") if REFERENCES_DIR else file_upload_references,
+                ],
+                justify="center"
             )
 
     mo.md(
@@ -134,211 +249,946 @@ def _(file_upload_data, file_upload_references):
     return
 
 
-@app.cell
-def _(SCHEMA_OVERRIDES):
-    # -----------------------------
-    # File Loading
-    # -----------------------------
-    def load_file(file_widget) -> pl.DataFrame | None:
-        """
-        Load the first uploaded CSV or Excel file into a Polars DataFrame.
-        Returns None if no file is uploaded.
-        """
-        # Try to get the first file
-        file_bytes = file_widget.contents(0)
-        file_name = file_widget.name(0)
-
-        # Check if a file was actually uploaded
-        if file_bytes is None or file_name is None:
-            return None
-
-        if file_name.lower().endswith(".csv"):
-            df = pl.read_csv(io.BytesIO(file_bytes), schema_overrides=SCHEMA_OVERRIDES)
-        elif file_name.lower().endswith((".xls", ".xlsx")):
-            df = pl.read_excel(io.BytesIO(file_bytes), schema_overrides=SCHEMA_OVERRIDES)
-        else:
-            raise ValueError(f"Unsupported file type: {file_name}")
+@app.function
+async def load_package(name: str):
+    """
+    Import a heavy package on first use. The WebAssembly build installs
+    every statically imported package before the page becomes interactive,
+    so packages loaded here are imported dynamically and, in the browser,
+    installed with micropip only when first needed.
+    """
+    if sys.platform == "emscripten" and importlib.util.find_spec(name) is None:
+        import micropip
 
-        return df
-    return (load_file,)
+        await micropip.install(name)
+    return importlib.import_module(name)
 
 
 @app.cell
-def _():
-    # -----------------------------
-    # Configuration
-    # -----------------------------
-    SCHEMA_OVERRIDES = {
-        "Start Time": pl.Utf8,
-        "End Time": pl.Utf8,
-        "Phone": pl.Utf8,
-        "Appointment Price": pl.Utf8,
-        "Amount Paid Online": pl.Utf8,
-        "Certificate Code": pl.Utf8,
-        "Date Scheduled": pl.Utf8,
-        "Label": pl.Utf8,
-        "Date Rescheduled": pl.Utf8,
-        "Appointment ID": pl.Int64,
+async def _():
+    # Cells run in file order, so Polars installs once the header and upload
+    # widgets above have rendered and before any cell below uses it
+    await load_package("polars")
+    return
+
+
+@app.function
+def peak_rss_mb() -> float | None:
+    """Peak resident memory of this process in MB, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+@app.function
+def rss_mb() -> float | None:
+    """Current resident memory of this process in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+@app.function
+def mb_delta(before: float | None, after: float | None) -> float | None:
+    """Difference of two memory readings, or None if either is unavailable."""
+    return None if before is None or after is None else after - before
+
+
+@app.function
+def traced_call(name: str, fn, *args, **kwargs):
+    """
+    Call `fn(*args, **kwargs)` and, when tracing is enabled, record wall time,
+    rows and estimated size of the DataFrames in/out, and how much the stage
+    grew resident memory: the change in current RSS, and how far it raised the
+    process's peak RSS (zero when an earlier stage already peaked higher).
+    """
+    if not TRACE["enabled"]:
+        return fn(*args, **kwargs)
+
+    frames_in = [a for a in args if isinstance(a, pl.DataFrame)]
+
+    rss_before, peak_before = rss_mb(), peak_rss_mb()
+    start = time.perf_counter()
+    output = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    rss_after, peak_after = rss_mb(), peak_rss_mb()
+
+    frame_out = output if isinstance(output, pl.DataFrame) else None
+
+    TRACE["events"].append({
+        "stage": name,
+        "start_us": start * 1e6,
+        "duration_ms": elapsed * 1e3,
+        "rows_in": sum(f.height for f in frames_in) if frames_in else None,
+        "rows_out": frame_out.height if frame_out is not None else None,
+        "mb_in": sum(f.estimated_size("mb") for f in frames_in) if frames_in else None,
+        "mb_out": frame_out.estimated_size("mb") if frame_out is not None else None,
+        "rss_delta_mb": mb_delta(rss_before, rss_after),
+        "peak_rss_increase_mb": mb_delta(peak_before, peak_after),
+    })
+
+    return output
+
+
+@app.function
+def chrome_trace(events) -> dict:
+    """Convert recorded trace events to the Chrome trace event format."""
+    return {
+        "traceEvents": [
+            {
+                "name": event["stage"],
+                "cat": "data_explorer",
+                "ph": "X",
+                "ts": event["start_us"],
+                "dur": event["duration_ms"] * 1e3,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {
+                    key: value for key, value in event.items()
+                    if key not in ("stage", "start_us", "duration_ms")
+                },
+            }
+            for event in events
+        ],
+        "displayTimeUnit": "ms",
     }
-    return (SCHEMA_OVERRIDES,)
 
 
-@app.cell
-def _():
-    # -----------------------------
-    # Utility Functions
-    # -----------------------------
-    def format_phone(s: str) -> str:
-        """Normalize phone numbers to +1 (XXX) XXX-XXXX format."""
-        digits = ''.join(filter(str.isdigit, s or ""))
-        if len(digits) == 11 and digits.startswith("1"):
-            digits = digits[1:]
-        if len(digits) < 10:
-            digits = digits.zfill(10)
-        if len(digits) == 10:
-            return f"+1 ({digits[:3]}) {digits[3:6]}-{digits[6:]}"
-        return s or "N/A"
-
-    def to_snake_case(name: str) -> str:
-        """Convert string to snake_case."""
-        name = re.sub(r"[^\w\s]", "", name)  # remove special characters
-        name = re.sub(r"\s+", "_", name)     # replace spaces with underscore
-        return name.lower()
-
-    def clean_column_names(df: pl.DataFrame) -> pl.DataFrame:
-        """Rename all columns to snake_case."""
-        new_names = {col: to_snake_case(col) for col in df.columns}
-        return df.rename(new_names)
-    return clean_column_names, format_phone
-
-
-@app.cell
-def _(clean_column_names, format_phone):
-    # -----------------------------
-    # Data Cleaning
-    # -----------------------------
-    def clean_data(df: pl.DataFrame) -> pl.DataFrame:
-        """
-        Clean and transform appointment data:
-        - Parse datetime columns safely
-        - Normalize text columns
-        - Format phone numbers
-        - Add concatenated fields
-        """
-        df = df.with_columns([
-            # Parse Start Time and End Time with correct format, fallback to null if parsing fails
-            pl.col("Start Time").str.strptime(
-                pl.Datetime, "%B %d, %Y %I:%M %p", strict=False
-            ).dt.replace_time_zone("America/New_York"),
-
-            pl.col("End Time").str.strptime(
-                pl.Datetime, "%B %d, %Y %I:%M %p", strict=False
-            ).dt.replace_time_zone("America/New_York"),
-
-            # Normalize text columns
-            pl.col("First Name").str.to_titlecase().fill_null("N/A"),
-            pl.col("Last Name").str.to_titlecase().fill_null("N/A"),
-            pl.col("Phone").fill_null("N/A"),
-            pl.col("Email").fill_null("N/A"),
-            pl.col("Type").str.to_titlecase(),
-            pl.col("Calendar").str.to_titlecase(),
-            pl.col("Paid?").str.to_titlecase(),
-            pl.col("Label").str.to_titlecase(),
-
-            # Parse date columns safely
-            pl.col("Date Scheduled").str.strptime(pl.Date, "%Y-%m-%d", strict=False),
-            pl.col("Date Rescheduled").str.strptime(pl.Date, "%Y-%m-%d", strict=False),
-
-            # Clean numeric columns
-            pl.col("Appointment Price").str.replace_all(",", "").cast(pl.Float64),
-            pl.col("Amount Paid Online").str.replace_all(",", "").cast(pl.Float64),
-        ])
+@app.function
+def csv_record_end(data: bytes) -> int:
+    """Offset just past the last newline in `data` that is not inside a quoted field."""
+    end = data.rfind(b"\n")
+    # Escaped quotes come in pairs, so an odd count means the newline is quoted
+    while end != -1 and data.count(b'"', 0, end) % 2:
+        end = data.rfind(b"\n", 0, end)
+    return end + 1
 
-        # Standardize column names
-        df = clean_column_names(df)
 
-        # Format phone numbers
-        df = df.with_columns(
-            pl.col("phone").map_elements(format_phone).alias("phone")
+@app.function
+def read_csv_blocks(stream) -> pl.DataFrame:
+    """
+    Parse a CSV from a binary stream `CSV_BLOCK_BYTES` at a time, so only one
+    block of text is held next to the parsed frames. Blocks are cut after the
+    last complete record; the schema is inferred from the first block (as
+    `pl.read_csv` would from the first rows) and reused for the rest.
+    """
+    frames, header, tail = [], b"", b""
+    while True:
+        block = stream.read(CSV_BLOCK_BYTES)
+        data = tail + block
+        end = csv_record_end(data) if block else len(data)
+        records, tail = data[:end], data[end:]
+
+        if not frames:
+            if block and records.count(b"\n") < 2:
+                # Wait for the header and at least one record
+                tail = data
+                continue
+            header = records[: records.find(b"\n") + 1]
+            frames.append(pl.read_csv(io.BytesIO(records), schema_overrides=SCHEMA_OVERRIDES))
+        elif records.strip():
+            frames.append(pl.read_csv(io.BytesIO(header + records), schema=frames[0].schema))
+
+        if not block:
+            return pl.concat(frames, rechunk=False)
+
+
+@app.function
+def read_zip(source) -> pl.DataFrame:
+    """
+    Read every CSV in a zip archive and stack them into one DataFrame.
+    Each member is decompressed and parsed block by block, so no member's
+    full text is ever held in memory.
+    """
+    with zipfile.ZipFile(source) as archive:
+        members = sorted(
+            name for name in archive.namelist()
+            if name.lower().endswith(".csv") and not name.startswith("__MACOSX/")
         )
+        if not members:
+            raise ValueError("Zip archive contains no CSV files")
 
-        # Add concatenated fields
-        df = df.with_columns([
-            pl.concat_str(["first_name", "last_name"], separator=" ").alias("full_name"),
-            pl.concat_str(["first_name", "phone"], separator="; ").alias("first_name_and_phone"),
-            pl.concat_str(["first_name", "email"], separator="; ").alias("first_name_and_email"),
-        ])
+        frames = []
+        for member in members:
+            with archive.open(member) as member_file:
+                frames.append(read_csv_blocks(member_file))
 
-        return df
-    return (clean_data,)
+    return pl.concat(frames, how="diagonal_relaxed", rechunk=False)
 
 
-@app.cell
-def _(clean_data, file_upload_data, load_file):
-    # Load uploaded file
-    df_data = load_file(file_upload_data)
+@app.function
+def read_table(source, file_name: str) -> pl.DataFrame:
+    """
+    Read a CSV, compressed CSV or Excel export into a Polars DataFrame.
+    `source` may be raw bytes, a file-like object or a path.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    name = file_name.lower()
+    if name.endswith((".csv", ".csv.gz", ".csv.zst")):
+        # Polars detects gzip/zstd from the magic bytes and decompresses the
+        # whole payload natively before parsing. Peak memory is still set by
+        # the parsed frame (about the same as plain CSV at 1M rows); parsing
+        # block by block here was slower and used more memory
+        df = pl.read_csv(source, schema_overrides=SCHEMA_OVERRIDES)
+    elif name.endswith(".zip"):
+        df = read_zip(source)
+    elif name.endswith((".xls", ".xlsx")):
+        df = pl.read_excel(source, schema_overrides=SCHEMA_OVERRIDES)
+    else:
+        raise ValueError(f"Unsupported file type: {file_name}")
+
+    return df
+
+
+@app.function
+def load_file(file_widget) -> pl.DataFrame | None:
+    """
+    Load the first uploaded CSV, compressed CSV or Excel file into a Polars DataFrame.
+    Returns None if no file is uploaded.
+    """
+    # Try to get the first file
+    file_bytes = file_widget.contents(0)
+    file_name = file_widget.name(0)
 
-    if df_data is None:
-        df_data_clean = None
+    # Check if a file was actually uploaded
+    if file_bytes is None or file_name is None:
+        return None
+
+    return read_table(file_bytes, file_name)
+
+
+@app.function
+def settled_stat(source: Path) -> os.stat_result | None:
+    """
+    Stat `source`, or return None if it is still being written: a file
+    modified within the last `INGEST_SETTLE_SECONDS` must keep the same size
+    and mtime until that much time has passed.
+    """
+    before = source.stat()
+    wait = INGEST_SETTLE_SECONDS - (time.time() - before.st_mtime)
+    if wait <= 0:
+        return before
+    time.sleep(wait)
+    after = source.stat()
+    if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+        return None
+    return after
+
+
+@app.function
+def directory_signature(path: Path) -> tuple:
+    """Name, size and mtime of every file in `path`, sorted by name."""
+    entries = [entry for entry in os.scandir(path) if entry.is_file()]
+    return tuple(sorted((entry.name, entry.stat().st_size, entry.stat().st_mtime_ns) for entry in entries))
+
+
+@app.function
+def watch_directory(path: Path, signature: tuple, set_signature):
+    """
+    Poll `path` every `INGEST_SETTLE_SECONDS` from a `mo.Thread` and pass its
+    `directory_signature` to `set_signature` once it differs from `signature`
+    and has held still for a poll. Unlike `mo.watch.directory`, this also
+    fires for files rewritten in place and for files that were skipped while
+    still being copied. The thread stops when the calling cell re-runs.
+    """
+    def poll():
+        thread = mo.current_thread()
+        reported = previous = signature
+        while not thread.should_exit:
+            time.sleep(INGEST_SETTLE_SECONDS)
+            try:
+                current = directory_signature(path)
+            except OSError:
+                continue
+            if current == previous and current != reported:
+                set_signature(current)
+                reported = current
+            previous = current
+
+    mo.Thread(target=poll, daemon=True).start()
+
+
+@app.function
+def ipc_cache_dir(source_dir: Path, cache_dir: Path, tag: str) -> Path:
+    """Folder inside `cache_dir` holding the `tag` entries for files of `source_dir`."""
+    key = hashlib.sha1(str(source_dir.resolve()).encode()).hexdigest()[:12]
+    return cache_dir / f"{tag}.{key}"
+
+
+@app.function
+def ipc_cache_path(source: Path, stat: os.stat_result, cache_dir: Path, tag: str) -> Path:
+    """
+    Location of the Arrow IPC copy of `source` inside `cache_dir`, named after
+    the file's size and mtime so any change to the file maps to a new entry.
+    """
+    signature = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+    return ipc_cache_dir(source.parent, cache_dir, tag) / f"{source.name}.{signature}.arrow"
+
+
+@app.function
+def ingest_files(paths, cache_dir: Path, transform=None) -> tuple[pl.DataFrame | None, dict]:
+    """
+    Read server-side export files through an Arrow IPC cache.
+    Each file is parsed once, passed through `transform` (e.g. `clean_data`)
+    and stored as uncompressed Arrow IPC, which later runs memory-map instead
+    of re-parsing. Cache entries for files that changed or are no longer in
+    `paths` are removed. Files still being written or that cannot be read
+    are skipped. Returns the combined frame (None if no file was read) and
+    the reason each skipped file was skipped, by file name.
+    """
+    sources = sorted(
+        path for path in paths
+        if path.is_file()
+        and not path.name.startswith(".")
+        and path.name.lower().endswith(INGEST_SUFFIXES)
+    )
+
+    # Imported dynamically so the WebAssembly build does not preload pyarrow
+    pa = importlib.import_module("pyarrow")
+
+    tag = f"{getattr(transform, '__name__', 'raw')}-v{INGEST_CACHE_VERSION}"
+
+    frames = []
+    entries = set()
+    skipped = {}
+    for source in sources:
+        stat = settled_stat(source)
+        if stat is None:
+            skipped[source.name] = "still being written"
+            continue
+
+        cache = ipc_cache_path(source, stat, cache_dir, tag)
+        if not cache.exists():
+            try:
+                df = read_table(source, source.name)
+                if transform is not None:
+                    df = transform(df)
+            except (ValueError, pl.exceptions.PolarsError, zipfile.BadZipFile) as error:
+                skipped[source.name] = str(error)
+                continue
+            # Write then rename so a concurrent reader never sees a partial file
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_suffix(".tmp")
+            df.write_ipc(tmp, compression="uncompressed")
+            os.replace(tmp, cache)
+        entries.add(cache)
+
+        # Memory-map the uncompressed IPC file; Polars adopts the Arrow
+        # buffers without copying them
+        table = pa.ipc.open_file(pa.memory_map(str(cache))).read_all()
+        frames.append(pl.from_arrow(table, rechunk=False))
+
+    # Drop entries of replaced or removed files in the directories read here
+    for source_dir in {path.parent for path in paths}:
+        for entry in ipc_cache_dir(source_dir, cache_dir, tag).glob("*.arrow"):
+            if entry not in entries:
+                entry.unlink(missing_ok=True)
+
+    if not frames:
+        return None, skipped
+    return pl.concat(frames, how="diagonal_relaxed", rechunk=False), skipped
+
+
+@app.function
+def skipped_files_callout(skipped: dict, what: str):
+    """Callout listing the files `ingest_files` skipped, or None."""
+    if not skipped:
+        return None
+    lines = "\n".join(f"- `{name}`: {reason}" for name, reason in skipped.items())
+    # Files still being copied are picked up once they settle
+    kind = "warn" if set(skipped.values()) == {"still being written"} else "danger"
+    return mo.callout(mo.md(f"**Skipped {what} files:**\n\n{lines}"), kind=kind)
+
+
+@app.function
+def format_phone(s: str) -> str:
+    """Normalize phone numbers to +1 (XXX) XXX-XXXX format."""
+    digits = ''.join(filter(str.isdigit, s or ""))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    if len(digits) < 10:
+        digits = digits.zfill(10)
+    if len(digits) == 10:
+        return f"+1 ({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    return s or "N/A"
+
+
+@app.function
+def to_snake_case(name: str) -> str:
+    """Convert string to snake_case."""
+    name = re.sub(r"[^\w\s]", "", name)  # remove special characters
+    name = re.sub(r"\s+", "_", name)     # replace spaces with underscore
+    return name.lower()
+
+
+@app.function
+def clean_column_names(df: pl.DataFrame) -> pl.DataFrame:
+    """Rename all columns to snake_case."""
+    new_names = {col: to_snake_case(col) for col in df.columns}
+    return df.rename(new_names)
+
+
+@app.function
+def clean_data(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Clean and transform appointment data:
+    - Parse datetime columns safely
+    - Normalize text columns
+    - Format phone numbers
+    - Add concatenated fields
+    """
+    df = df.with_columns([
+        # Parse Start Time and End Time with correct format, fallback to null if parsing fails
+        pl.col("Start Time").str.strptime(
+            pl.Datetime, "%B %d, %Y %I:%M %p", strict=False
+        ).dt.replace_time_zone("America/New_York"),
+
+        pl.col("End Time").str.strptime(
+            pl.Datetime, "%B %d, %Y %I:%M %p", strict=False
+        ).dt.replace_time_zone("America/New_York"),
+
+        # Normalize text columns
+        pl.col("First Name").str.to_titlecase().fill_null("N/A"),
+        pl.col("Last Name").str.to_titlecase().fill_null("N/A"),
+        pl.col("Phone").fill_null("N/A"),
+        pl.col("Email").fill_null("N/A"),
+        pl.col("Type").str.to_titlecase(),
+        pl.col("Calendar").str.to_titlecase(),
+        pl.col("Paid?").str.to_titlecase(),
+        pl.col("Label").str.to_titlecase(),
+
+        # Parse date columns safely
+        pl.col("Date Scheduled").str.strptime(pl.Date, "%Y-%m-%d", strict=False),
+        pl.col("Date Rescheduled").str.strptime(pl.Date, "%Y-%m-%d", strict=False),
+
+        # Clean numeric columns
+        pl.col("Appointment Price").str.replace_all(",", "").cast(pl.Float64),
+        pl.col("Amount Paid Online").str.replace_all(",", "").cast(pl.Float64),
+    ])
+
+    # Standardize column names
+    df = clean_column_names(df)
+
+    # Format phone numbers
+    df = df.with_columns(
+        pl.col("phone").map_elements(format_phone).alias("phone")
+    )
+
+    # Add concatenated fields
+    df = df.with_columns([
+        pl.concat_str(["first_name", "last_name"], separator=" ").alias("full_name"),
+        pl.concat_str(["first_name", "phone"], separator="; ").alias("first_name_and_phone"),
+        pl.concat_str(["first_name", "email"], separator="; ").alias("first_name_and_email"),
+    ])
+
+    return df
+
+
+@app.cell
+def _(file_upload_data, get_data_files):
+    # Load server-side exports (cached already cleaned) or the uploaded file
+    data_error = None
+    data_files = get_data_files()
+    if data_files is not None:
+        df_data_clean, data_skipped = traced_call(
+            "ingest_files[data]",
+            ingest_files,
+            [Path(DATA_DIR) / name for name, _, _ in data_files],
+            IPC_CACHE_DIR,
+            clean_data,
+        )
+        data_error = skipped_files_callout(data_skipped, "data")
     else:
+        try:
+            df_data = traced_call("load_file[data]", load_file, file_upload_data)
+        except (ValueError, pl.exceptions.PolarsError, zipfile.BadZipFile) as error:
+            df_data = None
+            data_error = mo.callout(mo.md(f"**Could not read the data file:** {error}"), kind="danger")
+
         # Clean and transform data
-        df_data_clean = clean_data(df_data)
+        df_data_clean = None if df_data is None else traced_call("clean_data", clean_data, df_data)
 
     # Preview cleaned data
     # df_data_clean
+    data_error
     return (df_data_clean,)
 
 
-@app.cell
-def _(clean_column_names):
-    # -----------------------------
-    # Data Cleaning
-    # -----------------------------
-    def clean_references(df: pl.DataFrame) -> pl.DataFrame:
-        """
-        Clean and transform appointment data:
-        - Parse datetime columns
-        - Normalize text columns
-        - Format phone numbers
-        - Add concatenated fields
-        """
-        df = df.with_columns([
-            pl.col("Type").str.to_titlecase(),
-            pl.col("Include or not include").str.to_titlecase(),
-            pl.col("Revised Type").str.to_titlecase(),
-            pl.col("Initial / Touch up").str.to_titlecase(),
-            pl.col("Free Touch Up").str.to_titlecase(),
-        ])
+@app.function
+def clean_references(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Clean and transform reference/mapping data:
+    - Normalize text columns
+    - Standardize column names
+    """
+    df = df.with_columns([
+        pl.col("Type").str.to_titlecase(),
+        pl.col("Include or not include").str.to_titlecase(),
+        pl.col("Revised Type").str.to_titlecase(),
+        pl.col("Initial / Touch up").str.to_titlecase(),
+        pl.col("Free Touch Up").str.to_titlecase(),
+    ])
+
+    # Standardize column names
+    df = clean_column_names(df)
+
+    return df
+
+
+@app.function
+def compile_references(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Compile cleaned reference mappings into a lookup table:
+    - Drop rows without a type and exact duplicate rows
+    - Reject types still mapped more than once (e.g. to two revised types),
+      since the extra row would multiply every matching appointment in the join
+    - Sort by type and encode it as an Enum, so row i holds category i
+    """
+    df = df.filter(pl.col("type").is_not_null()).unique(maintain_order=True)
+
+    conflicts = (
+        df.filter(pl.col("type").is_duplicated())
+        .group_by("type")
+        .agg(pl.col("revised_type").unique().sort().str.join(" / "))
+        .sort("type")
+    )
+    if not conflicts.is_empty():
+        listed = ", ".join(f"{type_} ({revised})" for type_, revised in conflicts.iter_rows())
+        raise ValueError(f"Reference file maps these types to conflicting values: {listed}")
+
+    df = df.sort("type")
+    return df.with_columns(pl.col("type").cast(pl.Enum(df["type"].to_list())))
+
+
+@app.function
+def reference_version(compiled: pl.DataFrame) -> str:
+    """Content hash of compiled references, stable across sessions."""
+    return hashlib.blake2b(compiled.write_csv().encode(), digest_size=6).hexdigest()
 
-        # Standardize column names
-        df = clean_column_names(df)
 
-        return df
-    return (clean_references,)
+@app.function
+def read_reference_index(store_dir: Path) -> dict:
+    """
+    Index of the reference store: source hashes to versions, versions in order.
+    A missing or unreadable index reads as an empty store.
+    """
+    try:
+        return json.loads((store_dir / "index.json").read_text())
+    except (OSError, ValueError):
+        return {"sources": {}, "versions": []}
+
+
+@app.function
+def load_reference_version(store_dir: Path, version: str) -> pl.DataFrame:
+    """Read one compiled reference version from the store."""
+    return pl.read_ipc(store_dir / f"{version}.arrow")
+
+
+@app.function
+def store_references(df_references: pl.DataFrame, store_dir: Path) -> tuple[pl.DataFrame, str]:
+    """
+    Return the compiled references for a raw reference file and its version.
+    A file seen before is read back from the store instead of being cleaned
+    and validated again; a new one is compiled and saved as a new version.
+    If the store cannot be written (read-only or full disk), the compiled
+    mapping is used for this session without being stored.
+    """
+    source_key = hashlib.blake2b(df_references.write_csv().encode(), digest_size=16).hexdigest()
+    index = read_reference_index(store_dir)
+
+    version = index["sources"].get(source_key)
+    if version is not None:
+        try:
+            return load_reference_version(store_dir, version), version
+        except OSError:
+            pass
+
+    compiled = compile_references(clean_references(df_references))
+    version = reference_version(compiled)
+
+    index["sources"][source_key] = version
+    if version not in [entry["version"] for entry in index["versions"]]:
+        index["versions"].append({
+            "version": version,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "types": compiled.height,
+        })
+
+    try:
+        store_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp = store_dir / f"{version}.tmp"
+        compiled.write_ipc(tmp)
+        os.replace(tmp, store_dir / f"{version}.arrow")
+        tmp = store_dir / "index.json.tmp"
+        tmp.write_text(json.dumps(index, indent=2))
+        os.replace(tmp, store_dir / "index.json")
+    except OSError:
+        # Read-only or full cache directory: use the mapping without storing it
+        pass
+
+    return compiled, version
+
+
+@app.function
+def diff_references(old: pl.DataFrame, new: pl.DataFrame) -> pl.DataFrame:
+    """
+    Types added, removed or remapped between two compiled reference
+    versions, with the old and new value of each mapping column.
+    """
+    value_cols = [col for col in new.columns if col != "type"]
+    old = old.with_columns(pl.col("type").cast(pl.Utf8))
+    new = new.with_columns(pl.col("type").cast(pl.Utf8))
+
+    joined = old.join(new, on="type", how="full", coalesce=True, suffix="_new")
+    changed = pl.any_horizontal([pl.col(col).ne_missing(pl.col(f"{col}_new")) for col in value_cols])
+
+    return (
+        joined.with_columns(
+            pl.when(~pl.col("type").is_in(new["type"].implode()))
+            .then(pl.lit("removed"))
+            .when(~pl.col("type").is_in(old["type"].implode()))
+            .then(pl.lit("added"))
+            .when(changed)
+            .then(pl.lit("changed"))
+            .alias("change")
+        )
+        .filter(pl.col("change").is_not_null())
+        .select(["type", "change"] + [c for col in value_cols for c in (col, f"{col}_new")])
+        .sort("type")
+    )
 
 
 @app.cell
-def _(clean_references, file_upload_references, load_file):
-    # Load uploaded file
-    df_references = load_file(file_upload_references)
+def _(file_upload_references, get_references_files):
+    # Load server-side reference files or the uploaded file
+    references_error = None
+    references_files = get_references_files()
+    if references_files is not None:
+        df_references, references_skipped = traced_call(
+            "ingest_files[references]",
+            ingest_files,
+            [Path(REFERENCES_DIR) / name for name, _, _ in references_files],
+            IPC_CACHE_DIR,
+        )
+        references_error = skipped_files_callout(references_skipped, "reference")
+    else:
+        try:
+            df_references = traced_call("load_file[references]", load_file, file_upload_references)
+        except (ValueError, pl.exceptions.PolarsError, zipfile.BadZipFile) as error:
+            df_references = None
+            references_error = mo.callout(mo.md(f"**Could not read the reference file:** {error}"), kind="danger")
+
+    references = None
+    references_version = None
+    if df_references is not None:
+        # Clean, validate and compile once per reference file; reuse afterwards
+        try:
+            references, references_version = traced_call(
+                "store_references", store_references, df_references, REFERENCE_STORE_DIR
+            )
+        except ValueError as error:
+            store_error = mo.callout(mo.md(f"**Could not use the reference file:** {error}"), kind="danger")
+            references_error = store_error if references_error is None else mo.vstack([references_error, store_error])
+
+    # Preview compiled references
+    # references
+    references_error
+    return references, references_version
+
 
-    if df_references is None:
-        df_references_clean = None
+@app.cell
+def _(references, references_version):
+    # Reference version and changes since the previous version (edit mode)
+    if mo.app_meta().mode != "edit" or references is None:
+        reference_section = None
     else:
-        # Clean and transform data
-        df_references_clean = clean_references(df_references)
+        reference_versions = [
+            entry["version"] for entry in read_reference_index(REFERENCE_STORE_DIR)["versions"]
+        ]
+        position = (
+            reference_versions.index(references_version)
+            if references_version in reference_versions
+            else None
+        )
+        if position is None:
+            reference_changes = mo.md("Not stored: the reference store could not be written.")
+        elif position == 0:
+            reference_changes = mo.md("First stored version.")
+        else:
+            previous_version = reference_versions[position - 1]
+            try:
+                reference_changes = mo.vstack([
+                    mo.md(f"Changes since `{previous_version}`:"),
+                    diff_references(load_reference_version(REFERENCE_STORE_DIR, previous_version), references),
+                ])
+            except OSError:
+                # Pruned or unreadable store entry, handled as in store_references
+                reference_changes = mo.md(f"Previous version `{previous_version}` is missing from the store.")
+
+        reference_section = mo.accordion({
+            f"Reference mappings `{references_version}` ({references.height} types)": mo.vstack(
+                [reference_changes, references]
+            )
+        })
 
-    # Preview cleaned data
-    # df_references_clean
-    return (df_references_clean,)
+    reference_section
+    return
+
+
+@app.function
+def join_references(df_data_clean: pl.DataFrame, references: pl.DataFrame) -> pl.DataFrame:
+    """
+    Attach the compiled reference mappings to each appointment by `type`.
+    Each type is encoded against the reference Enum, and its physical code
+    is the row of its mapping, so the lookup is a gather instead of a hash
+    join. Unknown types get null mappings, and reference columns that are
+    already in the data get a `_right` suffix, as in a left join.
+    """
+    codes = df_data_clean["type"].cast(references["type"].dtype, strict=False).to_physical()
+    return df_data_clean.hstack([
+        references[col].gather(codes).alias(f"{col}_right" if col in df_data_clean.columns else col)
+        for col in references.columns
+        if col != "type"
+    ])
+
+
+@app.function
+def phonetic_key(expr: pl.Expr) -> pl.Expr:
+    """Soundex-style phonetic key: first letter plus up to three consonant codes."""
+    letters = expr.str.to_lowercase().str.replace_all(r"[^a-z]", "")
+    codes = letters.str.slice(1)
+    for pattern, code in [
+        (r"[bfpv]", "1"), (r"[cgjkqsxz]", "2"), (r"[dt]", "3"),
+        (r"l", "4"), (r"[mn]", "5"), (r"r", "6"), (r"[aeiouyhw]", ""),
+    ]:
+        codes = codes.str.replace_all(pattern, code)
+    for code in "123456":
+        codes = codes.str.replace_all(f"{code}+", code)
+    return letters.str.slice(0, 1) + codes.str.slice(0, 3)
+
+
+@app.function
+def resolve_identities(
+    df: pl.DataFrame,
+    name_threshold: float = 0.6,
+    contact_name_threshold: float = 0.5,
+    max_block_size: int = 50,
+) -> pl.DataFrame:
+    """
+    Assign a stable `client_id` to each appointment by fuzzy identity resolution:
+    - Reduce rows to distinct contact profiles (name, phone digits, email)
+    - Block profiles on phone digits, email and a phonetic name key, skipping
+      blocks larger than `max_block_size` (shared placeholder contacts)
+    - Link profiles sharing a phone or email when their first names have a
+      padded-bigram Jaccard similarity of at least `contact_name_threshold`,
+      one name is a prefix of the other ("J", "Jo") or the names are the same
+      letters transposed ("Olivia", "Olivai")
+    - Take connected components of those links, then join components linked
+      only by name (similarity of at least `name_threshold`) unless their
+      combined phone numbers or emails conflict, so a profile without
+      contacts cannot bridge two people with different ones
+
+    Work is linear in the number of rows plus the size of the candidate pairs,
+    which blocking keeps bounded. `client_id` is derived from the smallest
+    profile in each client, so it is stable across runs.
+    """
+    profile_cols = ["first_key", "last_key", "phone_key", "email_key"]
+
+    df = df.with_columns(
+        pl.col("first_name").str.to_lowercase().str.replace_all(r"[^a-z]", "").alias("first_key"),
+        pl.col("last_name").str.to_lowercase().str.replace_all(r"[^a-z]", "").alias("last_key"),
+        # Last 10 digits, so numbers with and without the country code match
+        pl.col("phone").str.replace_all(r"\D", "").str.slice(-10).alias("phone_key"),
+        pl.col("email").str.strip_chars().str.to_lowercase().alias("email_key"),
+    ).with_columns(
+        # Missing or placeholder contacts become "" so they never form blocks
+        pl.when((pl.col("phone_key").str.len_chars() == 10) & ~pl.col("phone_key").str.contains(r"^0+$"))
+        .then(pl.col("phone_key")).otherwise(pl.lit("")).alias("phone_key"),
+        pl.when(pl.col("email_key").str.contains("@"))
+        .then(pl.col("email_key")).otherwise(pl.lit("")).alias("email_key"),
+        pl.col("first_key").fill_null(""),
+        pl.col("last_key").fill_null(""),
+    )
+
+    # Step 1: Distinct profiles, numbered in a stable order
+    profiles = (
+        df.select(profile_cols)
+        .unique()
+        .with_columns(pl.concat_str(profile_cols, separator="|").alias("profile"))
+        .sort("profile")
+        .with_row_index("node")
+        .with_columns(
+            (pl.col("first_key").str.slice(0, 1) + phonetic_key(pl.col("last_key"))).alias("name_key"),
+            # First letter plus the sorted letters, equal for transposition typos
+            (
+                pl.col("first_key").str.slice(0, 1)
+                + pl.col("first_key").str.split("").list.sort().list.join("")
+            ).alias("letters_key"),
+        )
+    )
+
+    # Padded first-name bigrams for similarity scoring
+    padded = pl.lit("^") + pl.col("first_key") + pl.lit("$")
+    grams = (
+        profiles.select("node", padded.alias("padded"))
+        .with_columns(pl.int_ranges(0, pl.col("padded").str.len_chars() - 1).alias("offset"))
+        .explode("offset")
+        .group_by("node")
+        .agg(pl.col("padded").str.slice(pl.col("offset"), 2).unique().alias("grams"))
+    )
+    profiles = profiles.join(grams, on="node", how="left")
+
+    # Step 2: Candidate pairs within each block
+    candidates = []
+    for key in ["phone_key", "email_key", "name_key"]:
+        blocks = (
+            profiles.filter(pl.col(key) != "")
+            .select("node", key)
+            .filter(pl.len().over(key) <= max_block_size)
+        )
+        candidates.append(
+            blocks.join(blocks, on=key, suffix="_b")
+            .filter(pl.col("node") < pl.col("node_b"))
+            .select("node", "node_b")
+        )
+    pairs = pl.concat(candidates).unique()
+
+    # Step 3: Score pairs and keep matches
+    attributes = profiles.select("node", "first_key", "letters_key", "grams", "phone_key", "email_key")
+    pairs = pairs.join(attributes, on="node").join(
+        attributes.rename(lambda c: f"{c}_b"), on="node_b"
+    )
+    shared = pl.col("grams").list.set_intersection(pl.col("grams_b")).list.len()
+    union = pl.col("grams").list.len() + pl.col("grams_b").list.len() - shared
+
+    def differs(col: str) -> pl.Expr:
+        return (pl.col(col) != "") & (pl.col(f"{col}_b") != "") & (pl.col(col) != pl.col(f"{col}_b"))
+
+    shares_contact = (
+        ((pl.col("phone_key") != "") & (pl.col("phone_key") == pl.col("phone_key_b")))
+        | ((pl.col("email_key") != "") & (pl.col("email_key") == pl.col("email_key_b")))
+    )
+    is_prefix = (
+        (pl.col("first_key") != "") & (pl.col("first_key_b") != "")
+        & (
+            pl.col("first_key").str.starts_with(pl.col("first_key_b"))
+            | pl.col("first_key_b").str.starts_with(pl.col("first_key"))
+        )
+    )
+    contact_name_match = (
+        (shared / union >= contact_name_threshold)
+        | is_prefix
+        | (pl.col("letters_key") == pl.col("letters_key_b"))
+    )
+    pairs = pairs.with_columns(shares_contact.alias("shares_contact"))
+    edges = pairs.filter(pl.col("shares_contact") & contact_name_match).select("node", "node_b")
+    name_edges = pairs.filter(
+        ~pl.col("shares_contact")
+        & (shared / union >= name_threshold)
+        & ~(differs("phone_key") | differs("email_key"))
+    ).select("node", "node_b", (shared / union).alias("similarity"))
+
+    # Step 4: Components of contact links by minimum-label propagation
+    links = pl.concat([
+        edges.select(pl.col("node").alias("a"), pl.col("node_b").alias("b")),
+        edges.select(pl.col("node_b").alias("a"), pl.col("node").alias("b")),
+    ])
+    labels = profiles.select("node", pl.col("node").alias("label"))
+    while True:
+        neighbour_min = (
+            links.join(labels, left_on="b", right_on="node")
+            .group_by("a")
+            .agg(pl.col("label").min().alias("neighbour_label"))
+        )
+        updated = labels.join(neighbour_min, left_on="node", right_on="a", how="left").select(
+            "node",
+            pl.min_horizontal("label", "neighbour_label").alias("label"),
+        )
+        if updated.join(labels, on="node").filter(pl.col("label") != pl.col("label_right")).is_empty():
+            break
+        labels = updated
+
+    # Step 5: Join components linked only by name, most similar first, unless
+    # the merged component would hold two phone numbers or two emails with
+    # none in common. Name-only links are few, so a union-find suffices.
+    component_links = (
+        name_edges.join(labels, on="node")
+        .join(labels.rename({"node": "node_b", "label": "label_b"}), on="node_b")
+        .filter(pl.col("label") != pl.col("label_b"))
+        .group_by("label", "label_b")
+        .agg(pl.col("similarity").max())
+        .sort(["similarity", "label", "label_b"], descending=[True, False, False])
+    )
+    if not component_links.is_empty():
+        contacts = {
+            row["label"]: (set(row["phones"]), set(row["emails"]))
+            for row in labels.join(profiles.select("node", "phone_key", "email_key"), on="node")
+            .group_by("label")
+            .agg(
+                pl.col("phone_key").filter(pl.col("phone_key") != "").unique().alias("phones"),
+                pl.col("email_key").filter(pl.col("email_key") != "").unique().alias("emails"),
+            )
+            .iter_rows(named=True)
+        }
+        parent = {}
+
+        def find(label: int) -> int:
+            while parent.get(label, label) != label:
+                label = parent[label]
+            return label
+
+        def conflicts(x: set, y: set) -> bool:
+            return bool(x) and bool(y) and x.isdisjoint(y)
+
+        for label_a, label_b, _ in component_links.iter_rows():
+            root_a, root_b = find(label_a), find(label_b)
+            if root_a == root_b:
+                continue
+            (phones_a, emails_a), (phones_b, emails_b) = contacts[root_a], contacts[root_b]
+            if conflicts(phones_a, phones_b) or conflicts(emails_a, emails_b):
+                continue
+            root, other = min(root_a, root_b), max(root_a, root_b)
+            parent[other] = root
+            contacts[root] = (phones_a | phones_b, emails_a | emails_b)
+
+        if parent:
+            labels = labels.with_columns(
+                pl.col("label").replace({label: find(label) for label in parent})
+            )
+
+    # Step 6: Stable id from each client's smallest profile
+    labels = labels.join(profiles.select(["node", "profile"] + profile_cols), on="node")
+    client_ids = (
+        labels.group_by("label")
+        .agg(pl.col("profile").min())
+        .with_columns(
+            pl.col("profile").map_elements(
+                lambda s: hashlib.blake2b(s.encode(), digest_size=8).hexdigest(),
+                return_dtype=pl.Utf8,
+            ).alias("client_id")
+        )
+        .select("label", "client_id")
+    )
+    clients = labels.join(client_ids, on="label").select(profile_cols + ["client_id"])
+
+    return df.join(clients, on=profile_cols, how="left").drop(profile_cols)
 
 
 @app.cell
-def _(df_data_clean, df_references_clean):
-    if df_data_clean is None or df_references_clean is None:
+def _(df_data_clean, references):
+    if df_data_clean is None or references is None:
         df = None
     else:
-        df = df_data_clean.join(df_references_clean, on = "type", how = "left")
+        df = traced_call("join_references", join_references, df_data_clean, references)
+        df = traced_call("resolve_identities", resolve_identities, df)
     # df
     return (df,)
 
@@ -360,35 +1210,43 @@ def _():
     return (include_or_not_include,)
 
 
+@app.function
+def count_records_status(df: pl.DataFrame) -> dict:
+    """Count kept, dropped and unknown records by `include_or_not_include`."""
+    # Normalize column for comparison
+    col_normalized = pl.col("include_or_not_include").str.strip_chars().str.to_lowercase()
+
+    return {
+        "kept": df.filter(col_normalized == "yes").height,
+        "dropped": df.filter(col_normalized == "no").height,
+        "unknown": df.filter(
+            col_normalized.is_null() | (~col_normalized.is_in(["yes", "no"]))
+        ).height,
+    }
+
+
 @app.cell
 def _(df, result):
     if result is None or result.is_empty():
         records_status_section = mo.md(
             """
             <h2 style="text-align: center;">Records Status</h2>
-            <p style="text-align: center;">⬆ Please upload both Data and Reference file to continue.<br> 
+            <p style="text-align: center;">⬆ Please upload both Data and Reference file to continue.<br>
             No data to display yet.</p>
             """)
     else:
-        # Normalize column for comparison
-        col_normalized = pl.col("include_or_not_include").str.strip_chars().str.to_lowercase()
-
         # Count records
-        records_to_keep = df.filter(col_normalized == "yes").height
-        records_to_drop = df.filter(col_normalized == "no").height
-        records_unknown = df.filter(
-            col_normalized.is_null() | (~col_normalized.is_in(["yes", "no"]))
-        ).height
+        records_status = traced_call("records_status", count_records_status, df)
 
         # Display stats
         records_to_keep_value = mo.stat(
-            value=records_to_keep, label="Kept", caption="number of records", bordered=True
+            value=records_status["kept"], label="Kept", caption="number of records", bordered=True
         )
         records_to_drop_value = mo.stat(
-            value=records_to_drop, label="Dropped", caption="number of records", bordered=True
+            value=records_status["dropped"], label="Dropped", caption="number of records", bordered=True
         )
         records_unknown_value = mo.stat(
-            value=records_unknown, label="Needs Review", caption="number of records", bordered=True
+            value=records_status["unknown"], label="Needs Review", caption="number of records", bordered=True
         )
 
         records_status_data_grid = mo.hstack(
@@ -411,10 +1269,9 @@ def _(df, result):
 def _():
     mo.md(r"""
     **Unique Individual Identification (Default Logic):**
-    - Grouping in this order, where order matters:
-      1. calendar
-      2. first_name
-      3. phone
+    - Grouping by client_id, which links appointments across calendars when
+      first names are similar (allowing typos) and they share a phone number,
+      an email, or a phonetic name with no conflicting contact details
     """)
     return
 
@@ -422,9 +1279,9 @@ def _():
 @app.cell
 def _():
     group_by = mo.ui.multiselect(
-            options=["calendar", "first_name", "last_name", "phone", "email"],
+            options=["client_id", "calendar", "first_name", "last_name", "phone", "email"],
             label="How to identify Unique Individual: Choose columns to group by",
-            value =["calendar", "first_name", "phone"],
+            value =["client_id"],
         )
 
     if mo.app_meta().mode == "edit":
@@ -436,14 +1293,86 @@ def _():
     return (group_by,)
 
 
-@app.cell
-def _(group_by):
-    sort_by = group_by.value + ["start_time"]
-    return (sort_by,)
+@app.function
+def include_filter(include_value: str | None) -> pl.Expr:
+    """Rows whose include_or_not_include matches `include_value` (case-insensitive, None keeps nulls)."""
+    return (
+        pl.when(include_value is None)
+        .then(pl.col("include_or_not_include").is_null())
+        .otherwise(
+            pl.col("include_or_not_include")
+            .str.strip_chars()
+            .str.to_lowercase()
+            == (include_value or "").lower()
+        )
+    )
+
+
+@app.function
+def build_result(df: pl.DataFrame, group_by: list[str], include_value: str | None) -> pl.DataFrame:
+    """
+    Build the per-appointment analysis table:
+    - Sort by the identity columns and start_time
+    - Keep rows matching `include_value` (case-insensitive, None keeps nulls)
+    - Number each individual's appointments
+    - Compute months since the previous appointment
+    - Mark each individual's final appointment number
+    """
+    sort_by = group_by + ["start_time"]
+
+    # Step 1: Sort
+    data_sorted = df.sort(sort_by)
+
+    # Step 2: Filter include_or_not_include (case-insensitive)
+    data_sorted = data_sorted.filter(include_filter(include_value))
+
+    # Step 3: Appointment number
+    data_numbered = data_sorted.with_columns(
+        (pl.col("start_time").cum_count().over(group_by))
+        .alias("appointment_number")
+    )
+
+    # Step 4: Month difference
+    df_final = data_numbered.with_columns([
+        pl.col("start_time").dt.year().alias("year"),
+        pl.col("start_time").dt.month().alias("month"),
+    ]).with_columns([
+        (
+            (pl.col("year") - pl.col("year").shift(1)).over(group_by) * 12
+            + (pl.col("month") - pl.col("month").shift(1)).over(group_by)
+        ).alias("months_since_last_appointment")
+    ])
+
+    # Step 5: Final result
+    result = df_final.select([
+        "client_id",
+        "first_name",
+        "last_name",
+        "full_name",
+        "phone",
+        "email",
+        "calendar",
+        "type",
+        "revised_type",
+        "start_time",
+        "appointment_number",
+        "months_since_last_appointment",
+    ])
+
+    result = result.with_columns(
+        pl.col("appointment_number").max().over(group_by).alias("tmp_max")
+    ).with_columns(
+        pl.when(pl.col("appointment_number") == pl.col("tmp_max"))
+        .then(pl.col("tmp_max"))
+        .otherwise(None)
+        .alias("max_appointment_number")
+    ).drop("tmp_max")
+
+    return result
 
 
 @app.cell
-def _(df, group_by, include_or_not_include, sort_by):
+def _(df, group_by, include_or_not_include):
     if df is None or df.is_empty():
         result = None
         result_section = mo.md(
@@ -452,61 +1381,7 @@ def _(df, group_by, include_or_not_include, sort_by):
             <p style="text-align: center;">No data to display yet.</p>
             """)
     else:
-        # Step 1: Sort
-        data_sorted = df.sort(sort_by)
-
-        # Step 2: Filter include_or_not_include (case-insensitive)
-        data_sorted = data_sorted.filter(
-            pl.when(include_or_not_include.value is None)
-            .then(pl.col("include_or_not_include").is_null())
-            .otherwise(
-                pl.col("include_or_not_include")
-                .str.strip_chars()
-                .str.to_lowercase()
-                == include_or_not_include.value.lower()
-            )
-        )
-
-        # Step 3: Appointment number
-        data_numbered = data_sorted.with_columns(
-            (pl.col("start_time").cum_count().over(group_by.value))
-            .alias("appointment_number")
-        )
-
-        # Step 4: Month difference
-        df_final = data_numbered.with_columns([
-            pl.col("start_time").dt.year().alias("year"),
-            pl.col("start_time").dt.month().alias("month"),
-        ]).with_columns([
-            (
-                (pl.col("year") - pl.col("year").shift(1)).over(group_by.value) * 12
-                + (pl.col("month") - pl.col("month").shift(1)).over(group_by.value)
-            ).alias("months_since_last_appointment")
-        ])
-
-        # Step 5: Final result
-        result = df_final.select([
-            "first_name",
-            "last_name",
-            "full_name",
-            "phone",
-            "email",
-            "calendar",
-            "type",
-            "revised_type",
-            "start_time",
-            "appointment_number",
-            "months_since_last_appointment",
-        ])
-
-        result = result.with_columns(
-            pl.col("appointment_number").max().over(group_by.value).alias("tmp_max")
-        ).with_columns(
-            pl.when(pl.col("appointment_number") == pl.col("tmp_max"))
-            .then(pl.col("tmp_max"))
-            .otherwise(None)
-            .alias("max_appointment_number")
-        ).drop("tmp_max")
+        result = traced_call("build_result", build_result, df, group_by.value, include_or_not_include.value)
 
         if mo.app_meta().mode == "edit":
             title = mo.md(
@@ -536,22 +1411,41 @@ def _(df, group_by, include_or_not_include, sort_by):
     return (result,)
 
 
+@app.function
+def compute_kpis(result: pl.DataFrame) -> dict:
+    """Compute total records and median/min/max appointments per person."""
+    appointments = pl.col("max_appointment_number")
+    median, minimum, maximum = result.select(
+        appointments.median().alias("median"),
+        appointments.min().alias("min"),
+        appointments.max().alias("max"),
+    ).row(0)
+    return {
+        "total_appointments_records": result.height,
+        "avg_appointments": median,
+        "min_appointments": minimum,
+        "max_appointments": maximum,
+    }
+
+
 @app.cell
 def _(result):
     if result is None or result.is_empty():
+        avg_appointments = None
+        kpi_value_range = None
         kpi_section = mo.md(
             """
             <h2 style="text-align: center;">Key Performance Indicators (KPIs)</h2>
             <p style="text-align: center;">No data to display yet.</p>
             """)
     else:
-        # Compute KPIs
-        total_appointments_records = result.height
-        avg_appointments = result.select(pl.col("max_appointment_number").median()).item()
-        max_appointments = result.select(pl.col("max_appointment_number").max()).item()
+        # The min/max also give the histogram its bin edges
+        kpis = traced_call("kpis", compute_kpis, result)
+        avg_appointments = kpis["avg_appointments"]
+        kpi_value_range = (kpis["min_appointments"], kpis["max_appointments"])
 
         total_appointments_records_value = mo.stat(
-            value=total_appointments_records,
+            value=kpis["total_appointments_records"],
             label="Total Appointment Records",
             bordered=True,
         )
@@ -564,7 +1458,7 @@ def _(result):
         )
 
         max_appointments_value = mo.stat(
-            value=max_appointments,
+            value=kpis["max_appointments"],
             label="Max Appointments",
             caption="per person",
             bordered=True,
@@ -583,11 +1477,134 @@ def _(result):
         )
 
     kpi_section
-    return (avg_appointments,)
+    return avg_appointments, kpi_value_range
+
+
+@app.function
+def frame_digest(frame: pl.DataFrame) -> str:
+    """Content hash of a (small, pre-aggregated) frame, used as a cache key."""
+    content = repr((frame.schema, frame.hash_rows(seed=0).to_list()))
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+@app.function
+def cached_chart(build, data: pl.DataFrame, *args):
+    """
+    Return `build(data, *args)`, reusing the chart built last time for the
+    same data content and arguments. Chart data is pre-aggregated, so the
+    digest is cheap; the cache keeps the CHART_CACHE_SIZE most recently used
+    charts.
+    """
+    key = (build.__name__, frame_digest(data), args)
+    if key in CHART_CACHE:
+        CHART_CACHE.move_to_end(key)
+    else:
+        if len(CHART_CACHE) >= CHART_CACHE_SIZE:
+            CHART_CACHE.popitem(last=False)
+        CHART_CACHE[key] = build(data, *args)
+    return CHART_CACHE[key]
+
+
+@app.function
+def histogram_data(
+    result: pl.DataFrame,
+    avg_appointments: float,
+    bins: int = 10,
+    value_range: tuple | None = None,
+) -> pl.DataFrame:
+    """
+    Bin `max_appointment_number` in Polars: one row per non-empty bin with
+    its edges, count, whether it is the most common bin and the average, so
+    the chart payload is bounded by `bins`. `value_range` (min, max), e.g.
+    from `compute_kpis`, saves scanning `result` for the bin edges.
+    """
+    if value_range is not None:
+        min_val, max_val = value_range
+    else:
+        min_val = result['max_appointment_number'].min()
+        max_val = result['max_appointment_number'].max()
+    # A single distinct value still gets one bin of width one
+    bin_width = (max_val - min_val) / bins or 1
+
+    return (
+        result.filter(pl.col("max_appointment_number").is_not_null())
+        .select(
+            ((pl.col("max_appointment_number") - min_val) // bin_width)
+            .clip(upper_bound=bins - 1).cast(pl.Int64).alias("bin")
+        )
+        .group_by("bin")
+        .agg(pl.len().cast(pl.UInt32).alias("count"))
+        .sort("bin")
+        .select(
+            (pl.col("bin") * bin_width + min_val).alias("bin_start"),
+            (pl.col("bin") * bin_width + min_val + bin_width).alias("bin_end"),
+            "count",
+            # Most common bin for highlight
+            (pl.col("count") == pl.col("count").max()).alias("is_mode"),
+            pl.lit(avg_appointments, dtype=pl.Float64).alias("avg"),
+        )
+    )
+
+
+@app.function
+def histogram_chart(hist: pl.DataFrame):
+    """
+    Build the client appointment distribution histogram from `histogram_data`,
+    with an average line and floating label drawn from the same data.
+    """
+    alt = importlib.import_module("altair")
+
+    min_val = hist["bin_start"].min()
+    max_val = hist["bin_end"].max()
+    bin_width = hist["bin_end"][0] - hist["bin_start"][0]
+
+    base = alt.Chart(hist)
+
+    # Step 1: Histogram bars
+    hist_chart = base.mark_bar().encode(
+        x=alt.X('bin_start:Q', title='Number of Appointments', bin=alt.Bin(extent=[min_val, max_val], step=bin_width)),
+        x2='bin_end:Q',
+        y=alt.Y('count:Q', title='Number of People'),
+        tooltip=[
+            alt.Tooltip('count:Q', title='Number of People'),
+            alt.Tooltip('bin_start:Q', title='Appointments Range', format=".0f")
+        ],
+        color=alt.condition(
+            alt.datum.is_mode,
+            alt.value('#219ebc'),  # highlighted bin
+            alt.value('#8ecae6')   # normal bars
+        )
+    ).properties(
+        height=300,
+        width='container',
+        title='Client Appointment Distribution'
+    )
+
+    # Step 2: Average line, aggregated to a single mark
+    avg_line = base.mark_rule(
+        color='cyan', size=3
+    ).encode(
+        x='max(avg):Q',
+        tooltip=[alt.Tooltip('max(avg):Q', title='Average Appointments')]
+    )
+
+    # Floating label above the tallest bin
+    avg_label = base.mark_text(
+        color='cyan',
+        align='center',
+        fontWeight='bold',
+        dy=-10,
+    ).encode(
+        x='max(avg):Q',
+        y='max(count):Q',
+        text=alt.Text('max(avg):Q', format=".1f")
+    )
+
+    return hist_chart + avg_line + avg_label
 
 
 @app.cell
-def _(avg_appointments, result):
+async def _(avg_appointments, kpi_value_range, result):
     if result is None or result.is_empty():
         histogram_section = mo.md(
             """
@@ -595,91 +1612,599 @@ def _(avg_appointments, result):
             <p style="text-align: center;">No data to display yet.</p>
             """)
     else:
+        # Altair is only fetched once there is data to chart
+        await load_package("altair")
+        hist = traced_call(
+            "histogram_data", histogram_data, result, avg_appointments, value_range=kpi_value_range
+        )
+        histogram_chart_value = traced_call("histogram_chart", cached_chart, histogram_chart, hist)
 
-        # Step 1: Histogram bins in Polars
-        bins = 10
-        min_val = result['max_appointment_number'].min()
-        max_val = result['max_appointment_number'].max()
-        bin_width = (max_val - min_val) / bins
+        histogram_section = mo.vstack(
+            [
+                mo.md("<h2 style='text-align:center;'>Client Appointment Distribution</h2>"),
+                # altair_chart ships chart data to the browser as Arrow IPC
+                mo.ui.altair_chart(histogram_chart_value, chart_selection=False, legend_selection=False),
+            ],
+            justify="center",
+        )
+
+    histogram_section
+    return
+
+
+@app.function
+def rollup(frame: pl.DataFrame, every: str) -> pl.DataFrame:
+    """
+    Count appointments per `every` period (a Polars duration such as "1d")
+    for each calendar and revised_type. `frame` may be appointment rows or a
+    finer rollup, whose `appointments` counts are summed.
+    """
+    if "appointments" in frame.columns:
+        time_col, value = "period_start", pl.col("appointments").sum()
+    else:
+        time_col, value = "start_time", pl.len()
+
+    return (
+        frame.filter(pl.col(time_col).is_not_null())
+        .sort(time_col)
+        .group_by_dynamic(time_col, every=every, group_by=ROLLUP_KEYS)
+        .agg(value.cast(pl.UInt32).alias("appointments"))
+        .rename({time_col: "period_start"}, strict=False)
+    )
+
+
+@app.function
+def build_rollups(result: pl.DataFrame) -> dict:
+    """
+    Build the day -> week -> month pyramid of appointment counts. Only the
+    day level scans appointment rows; coarser levels roll up the level below.
+    """
+    day = rollup(result, ROLLUP_EVERY["Day"])
+    return {
+        "Day": day,
+        "Week": rollup(day, ROLLUP_EVERY["Week"]),
+        "Month": rollup(day, ROLLUP_EVERY["Month"]),
+    }
+
+
+@app.function
+def update_rollups(rollups: dict, appended: pl.DataFrame) -> dict:
+    """
+    Fold newly appended appointment rows into an existing pyramid. Periods
+    are calendar-aligned, so counts for the new rows are added per period
+    without rescanning earlier rows.
+    """
+    delta = build_rollups(appended)
+    return {
+        level: pl.concat([frame, delta[level]])
+        .group_by(ROLLUP_KEYS + ["period_start"])
+        .agg(pl.col("appointments").sum())
+        .sort(ROLLUP_KEYS + ["period_start"])
+        for level, frame in rollups.items()
+    }
 
-        # Add bin column
-        binned_df = result.with_columns(
-            ((pl.col("max_appointment_number") - min_val) // bin_width).cast(pl.Int64).alias("bin")
+
+@app.function
+def rollup_fingerprint(rows: pl.DataFrame) -> int:
+    """Order-independent hash of the columns rollups depend on, per appointment."""
+    return rows.select(
+        pl.struct("appointment_id", "start_time", "calendar", "revised_type").hash(seed=0).sum()
+    ).item()
+
+
+@app.function
+def refresh_rollups(previous: dict | None, rows: pl.DataFrame) -> dict:
+    """
+    Rollups of the included appointment `rows`, returned with the appointment
+    ids and fingerprint they were built from. When `previous` (an earlier
+    return value) covers a subset of `rows` whose appointments are unchanged,
+    only the appended rows are folded in with `update_rollups`; otherwise the
+    pyramid is rebuilt.
+    """
+    if "appointment_id" not in rows.columns or rows["appointment_id"].null_count():
+        return {"rollups": build_rollups(rows), "ids": None, "fingerprint": None}
+
+    ids = rows["appointment_id"]
+    if previous is not None and previous["ids"] is not None:
+        seen = ids.is_in(previous["ids"].implode())
+        earlier = rows.filter(seen)
+        if earlier.height == previous["ids"].len() and rollup_fingerprint(earlier) == previous["fingerprint"]:
+            appended = rows.filter(~seen)
+            return {
+                "rollups": update_rollups(previous["rollups"], appended) if appended.height else previous["rollups"],
+                "ids": ids,
+                "fingerprint": rollup_fingerprint(rows),
+            }
+
+    return {"rollups": build_rollups(rows), "ids": ids, "fingerprint": rollup_fingerprint(rows)}
+
+
+@app.function
+def pick_rollup_level(rollups: dict, max_periods: int = 400) -> str:
+    """Finest level with at most `max_periods` periods, so charts stay small."""
+    for level in ["Day", "Week", "Month"]:
+        if rollups[level]["period_start"].n_unique() <= max_periods:
+            return level
+    return "Month"
+
+
+@app.function
+def volume_data(level: pl.DataFrame, breakdown: str) -> pl.DataFrame:
+    """Appointments per period and `breakdown` value from one rollup level."""
+    return (
+        level.group_by("period_start", breakdown)
+        .agg(pl.col("appointments").sum())
+        .sort("period_start", breakdown, nulls_last=True)
+        .with_columns(pl.col("period_start").dt.strftime("%Y-%m-%d"))
+    )
+
+
+@app.function
+def volume_chart(volume: pl.DataFrame, breakdown: str, resolution: str):
+    """Stacked bar chart of `volume_data`, colored by `breakdown`."""
+    alt = importlib.import_module("altair")
+
+    return alt.Chart(volume).mark_bar().encode(
+        x=alt.X("period_start:T", title=resolution),
+        y=alt.Y("appointments:Q", title="Appointments", stack=True),
+        color=alt.Color(f"{breakdown}:N", title=breakdown.replace("_", " ").title()),
+        tooltip=[
+            alt.Tooltip("period_start:T", title=resolution),
+            alt.Tooltip(f"{breakdown}:N"),
+            alt.Tooltip("appointments:Q", title="Appointments"),
+        ],
+    ).properties(
+        height=300,
+        width="container",
+        title=f"Appointments per {resolution}",
+    )
+
+
+@app.cell
+def _():
+    # Rollups from the previous run, so rows appended to the watched data
+    # directory are folded in instead of rebuilding every level
+    get_rollup_state, set_rollup_state = mo.state(None)
+    return get_rollup_state, set_rollup_state
+
+
+@app.cell
+def _(df, get_rollup_state, include_or_not_include, result, set_rollup_state):
+    if result is None or result.is_empty():
+        rollups = None
+    else:
+        # The appointments in `result`, unsorted and with their ids
+        rollup_state = traced_call(
+            "refresh_rollups",
+            refresh_rollups,
+            get_rollup_state(),
+            df.filter(include_filter(include_or_not_include.value)),
         )
+        set_rollup_state(rollup_state)
+        rollups = rollup_state["rollups"]
+    return (rollups,)
 
-        # Aggregate counts per bin
-        hist_agg = (
-            binned_df.group_by("bin")
-            .agg(pl.count("max_appointment_number").alias("count"))
-            .sort("bin")
-            .with_columns([
-                (pl.col("bin") * bin_width + min_val).alias("bin_start"),
-                (pl.col("bin") * bin_width + min_val + bin_width).alias("bin_end")
-            ])
+
+@app.cell
+def _():
+    volume_resolution = mo.ui.dropdown(
+        options=["Auto"] + list(ROLLUP_EVERY), value="Auto", label="Resolution"
+    )
+    volume_breakdown = mo.ui.dropdown(
+        options=ROLLUP_KEYS, value="calendar", label="Break down by"
+    )
+    return volume_breakdown, volume_resolution
+
+
+@app.cell
+async def _(rollups, volume_breakdown, volume_resolution):
+    if rollups is None:
+        volume_section = mo.md(
+            """
+            <h2 style="text-align: center;">Appointment Volume</h2>
+            <p style="text-align: center;">No data to display yet.</p>
+            """)
+    else:
+        await load_package("altair")
+
+        resolution = (
+            pick_rollup_level(rollups)
+            if volume_resolution.value == "Auto"
+            else volume_resolution.value
+        )
+        volume = traced_call("volume_data", volume_data, rollups[resolution], volume_breakdown.value)
+        volume_chart_value = traced_call(
+            "volume_chart", cached_chart, volume_chart, volume, volume_breakdown.value, resolution
+        )
+
+        volume_section = mo.vstack(
+            [
+                mo.md("<h2 style='text-align:center;'>Appointment Volume</h2>"),
+                mo.hstack([volume_resolution, volume_breakdown], justify="center"),
+                mo.ui.altair_chart(volume_chart_value, chart_selection=False, legend_selection=False),
+            ],
+            justify="center",
         )
 
-        # Most common bin for highlight
-        max_count = hist_agg['count'].max()
-        mode_bin = hist_agg.filter(pl.col("count") == max_count).to_dicts()[0]
+    volume_section
+    return
+
+
+@app.function
+def build_revenue_cube(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Pre-aggregate appointment revenue by calendar, revised_type,
+    initial_touch_up and month. Only sums and counts are stored, so any
+    slice of the cube is answered by summing its cells.
+    """
+    return (
+        df.with_columns(
+            pl.col("start_time").dt.truncate("1mo").dt.date().alias("month")
+        )
+        .group_by(REVENUE_KEYS)
+        .agg(
+            pl.len().cast(pl.UInt32).alias("appointments"),
+            pl.col("appointment_price").sum().alias("price_sum"),
+            pl.col("appointment_price").count().cast(pl.UInt32).alias("price_count"),
+            pl.col("amount_paid_online").sum().alias("paid_online_sum"),
+            pl.col("amount_paid_online").count().cast(pl.UInt32).alias("paid_online_count"),
+        )
+        .sort(REVENUE_KEYS, nulls_last=True)
+    )
+
+
+@app.function
+def slice_revenue(cube: pl.DataFrame, by: list[str], filters: dict | None = None) -> pl.DataFrame:
+    """
+    Answer a revenue slice from the cube: keep cells whose dimensions are in
+    `filters` ({column: allowed values}), sum them per `by` and derive means.
+    """
+    for column, values in (filters or {}).items():
+        if values:
+            cube = cube.filter(pl.col(column).is_in(values))
+
+    sums = ["appointments", "price_sum", "price_count", "paid_online_sum", "paid_online_count"]
+    grouped = cube.group_by(by).agg(pl.col(sums).sum()) if by else cube.select(pl.col(sums).sum())
+
+    # A slice without any priced appointments has no mean rather than NaN
+    return grouped.with_columns(
+        pl.when(pl.col("price_count") > 0)
+        .then(pl.col("price_sum") / pl.col("price_count"))
+        .alias("price_mean"),
+        pl.when(pl.col("paid_online_count") > 0)
+        .then(pl.col("paid_online_sum") / pl.col("paid_online_count"))
+        .alias("paid_online_mean"),
+    ).sort(by or "appointments", nulls_last=True)
+
+
+@app.function
+def client_lifetime_value(df: pl.DataFrame, group_by: list[str]) -> pl.DataFrame:
+    """
+    Lifetime revenue, online payments and visit span per individual, where an
+    individual is identified by the `group_by` columns as in `build_result`.
+    """
+    return df.group_by(group_by).agg(
+        pl.len().cast(pl.UInt32).alias("appointments"),
+        pl.col("appointment_price").sum().alias("lifetime_value"),
+        pl.col("amount_paid_online").sum().alias("paid_online"),
+        pl.col("start_time").min().alias("first_visit"),
+        pl.col("start_time").max().alias("last_visit"),
+    )
+
+
+@app.cell
+def _(df, group_by, include_or_not_include):
+    if df is None or df.is_empty():
+        revenue_cube = None
+        lifetime_values = None
+    else:
+        df_included = df.filter(include_filter(include_or_not_include.value))
+        revenue_cube = traced_call("build_revenue_cube", build_revenue_cube, df_included)
+        lifetime_values = traced_call("client_lifetime_value", client_lifetime_value, df_included, group_by.value)
+    return lifetime_values, revenue_cube
+
+
+@app.cell
+def _(revenue_cube):
+    revenue_slice_by = mo.ui.dropdown(
+        options=REVENUE_KEYS, value="month", label="Slice by"
+    )
+    revenue_calendars = mo.ui.multiselect(
+        options=(
+            []
+            if revenue_cube is None
+            else revenue_cube["calendar"].drop_nulls().unique().sort().to_list()
+        ),
+        label="Calendars (all when empty)",
+    )
+    return revenue_calendars, revenue_slice_by
 
-        # Label slightly above tallest bin for floating average label
-        label_y = max_count * 1.05
 
+@app.cell
+def _(lifetime_values, revenue_calendars, revenue_cube, revenue_slice_by):
+    if revenue_cube is None:
+        revenue_section = mo.md(
+            """
+            <h2 style="text-align: center;">Revenue</h2>
+            <p style="text-align: center;">No data to display yet.</p>
+            """)
+    else:
+        revenue_filters = {"calendar": revenue_calendars.value}
+        revenue_totals = slice_revenue(revenue_cube, [], revenue_filters).row(0, named=True)
+        revenue_table = traced_call(
+            "slice_revenue", slice_revenue, revenue_cube, [revenue_slice_by.value], revenue_filters
+        )
 
-        # Step 2: Histogram chart
-        hist_data = alt.Data(values=hist_agg.select(["bin_start", "bin_end", "count"]).to_dicts())
+        revenue_stats = mo.hstack(
+            [
+                mo.stat(
+                    value=f"${revenue_totals['price_sum'] or 0:,.0f}",
+                    label="Appointment Revenue",
+                    bordered=True,
+                ),
+                mo.stat(
+                    value=f"${revenue_totals['paid_online_sum'] or 0:,.0f}",
+                    label="Paid Online",
+                    bordered=True,
+                ),
+                mo.stat(
+                    value=f"${revenue_totals['price_mean'] or 0:,.2f}",
+                    label="Average Price",
+                    caption="per appointment",
+                    bordered=True,
+                ),
+                mo.stat(
+                    value=f"${lifetime_values['lifetime_value'].median() or 0:,.2f}",
+                    label="Median Lifetime Value",
+                    caption="per person",
+                    bordered=True,
+                ),
+            ],
+            justify="center",
+        )
 
-        hist_chart = alt.Chart(hist_data).mark_bar().encode(
-            x=alt.X('bin_start:Q', title='Number of Appointments', bin=alt.Bin(extent=[min_val, max_val], step=bin_width)),
-            x2='bin_end:Q',
-            y=alt.Y('count:Q', title='Number of People'),
-            tooltip=[
-                alt.Tooltip('count:Q', title='Number of People'),
-                alt.Tooltip('bin_start:Q', title='Appointments Range', format=".0f")
+        revenue_section = mo.vstack(
+            [
+                mo.md("<h2 style='text-align:center;'>Revenue</h2>"),
+                revenue_stats,
+                mo.hstack([revenue_slice_by, revenue_calendars], justify="center"),
+                mo.ui.table(revenue_table, selection=None),
             ],
-            color=alt.condition(
-                alt.datum.bin_start == mode_bin['bin_start'],
-                alt.value('#219ebc'),  # highlighted bin
-                alt.value('#8ecae6')   # normal bars
-            )
-        ).properties(
-            height=300,
-            width='container',
-            title='Client Appointment Distribution'
+            justify="center",
         )
 
-        # ------------------------------
-        # Step 4: Average line
-        # ------------------------------
-        avg_line = alt.Chart(alt.Data(values=[{"avg": avg_appointments}])).mark_rule(
-            color='cyan', size=3
-        ).encode(
-            x='avg:Q',
-            tooltip=[alt.Tooltip('avg:Q', title='Average Appointments')]
+    revenue_section
+    return
+
+
+@app.function
+def sweep_intervals(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Sort appointments once per calendar by start_time and sweep them:
+    - `double_booked`: overlaps another appointment on the same calendar,
+      i.e. starts before the latest earlier end or ends after the next start
+    - `block`: id of the merged busy interval it belongs to, for counting
+      booked time without double-counting overlaps
+    Intervals are half-open, so back-to-back appointments do not overlap.
+    Rows without a calendar or a positive duration are skipped.
+    """
+    # Evaluated after sorting, so each window runs in start_time order
+    previous_end = pl.col("end_time").cum_max().shift(1).over("calendar")
+    next_start = pl.col("start_time").shift(-1).over("calendar")
+
+    return (
+        df.filter(
+            pl.col("calendar").is_not_null()
+            & (pl.col("end_time") > pl.col("start_time"))
+        )
+        .select("calendar", "start_time", "end_time", "full_name", "type")
+        .sort("calendar", "start_time", "end_time")
+        .with_columns(
+            ((pl.col("start_time") < previous_end) | (pl.col("end_time") > next_start))
+            .fill_null(False).alias("double_booked"),
+            (pl.col("start_time") >= previous_end).fill_null(True)
+            .cum_sum().over("calendar").alias("block"),
         )
+    )
+
+
+@app.function
+def concurrency_peaks(intervals: pl.DataFrame) -> pl.DataFrame:
+    """
+    Per calendar: appointments, double-booked appointments and the peak
+    number of appointments running at once, with when it first occurred.
+    Each appointment adds +1 at its start and -1 at its end; ends sort
+    before starts at the same instant, and a running sum gives concurrency.
+    """
+    events = pl.concat([
+        intervals.select("calendar", pl.col("start_time").alias("at"), pl.lit(1, dtype=pl.Int32).alias("delta")),
+        intervals.select("calendar", pl.col("end_time").alias("at"), pl.lit(-1, dtype=pl.Int32).alias("delta")),
+    ]).sort("calendar", "at", "delta")
+
+    peaks = (
+        events.with_columns(pl.col("delta").cum_sum().over("calendar").alias("concurrent"))
+        .group_by("calendar")
+        .agg(
+            pl.col("concurrent").max().alias("peak_concurrency"),
+            pl.col("at").get(pl.col("concurrent").arg_max()).alias("peak_at"),
+        )
+    )
 
-        # Floating label above average line
-        avg_label = alt.Chart(alt.Data(values=[{"avg": avg_appointments, "y": label_y}])).mark_text(
-            color='cyan',
-            align='center',
-            fontWeight='bold'
-        ).encode(
-            x='avg:Q',
-            y='y:Q',
-            text=alt.Text('avg:Q', format=".1f")
+    return (
+        intervals.group_by("calendar")
+        .agg(
+            pl.len().alias("appointments"),
+            pl.col("double_booked").sum().alias("double_booked"),
         )
+        .join(peaks, on="calendar")
+        .sort("calendar")
+    )
 
-        histogram_chart = hist_chart + avg_line + avg_label
 
-        histogram_section = mo.vstack(
+@app.function
+def calendar_utilization(intervals: pl.DataFrame, resolution: str = "Week") -> pl.DataFrame:
+    """
+    Booked hours per calendar and period from the merged busy blocks, and
+    utilization against OPEN_HOURS_PER_DAY on each OPEN_WEEKDAYS day of the
+    period. Blocks that cross a period boundary are split, so every period
+    only counts the hours booked inside it. Every period from a calendar's
+    first to its last booking is listed, with zero hours if none were booked.
+    """
+    every = UTILIZATION_EVERY[resolution]
+
+    blocks = intervals.group_by("calendar", "block").agg(
+        pl.col("start_time").min(),
+        pl.col("end_time").max(),
+    )
+
+    # One row per period a block touches, clipped to that period
+    pieces = (
+        blocks.with_columns(
+            pl.datetime_ranges(
+                pl.col("start_time").dt.truncate(every), pl.col("end_time"), every
+            ).alias("period_start")
+        )
+        .explode("period_start")
+        .with_columns(
+            pl.max_horizontal("start_time", "period_start").alias("booked_from"),
+            pl.min_horizontal("end_time", pl.col("period_start").dt.offset_by(every)).alias("booked_to"),
+        )
+        .filter(pl.col("booked_to") > pl.col("booked_from"))
+    )
+    booked = pieces.group_by("calendar", "period_start").agg(
+        ((pl.col("booked_to") - pl.col("booked_from")).dt.total_seconds().sum() / 3600).alias("booked_hours")
+    )
+    booked = (
+        booked.group_by("calendar")
+        .agg(pl.datetime_range(pl.col("period_start").min(), pl.col("period_start").max(), every))
+        .explode("period_start")
+        .join(booked, on=["calendar", "period_start"], how="left")
+        .with_columns(pl.col("booked_hours").fill_null(0.0))
+    )
+
+    open_hours = (
+        booked.select(pl.col("period_start").unique())
+        .with_columns(
+            (
+                pl.date_ranges(
+                    pl.col("period_start").dt.date(),
+                    pl.col("period_start").dt.offset_by(every).dt.date(),
+                    "1d",
+                    closed="left",
+                )
+                .list.eval(pl.element().dt.weekday().is_in(OPEN_WEEKDAYS))
+                .list.sum()
+                * OPEN_HOURS_PER_DAY
+            ).alias("open_hours")
+        )
+    )
+    return (
+        booked.join(open_hours, on="period_start")
+        .with_columns(
+            # Hours booked on a closed day have no capacity to measure against
+            pl.when(pl.col("open_hours") > 0)
+            .then(pl.col("booked_hours") / pl.col("open_hours"))
+            .alias("utilization")
+        )
+        .sort("calendar", "period_start")
+    )
+
+
+@app.function
+def utilization_chart(utilization: pl.DataFrame, resolution: str):
+    """Heatmap of utilization per calendar and period."""
+    alt = importlib.import_module("altair")
+
+    return alt.Chart(utilization).mark_rect().encode(
+        x=alt.X("period_start:T", title=resolution),
+        y=alt.Y("calendar:N", title="Calendar"),
+        color=alt.Color("utilization:Q", title="Utilization", scale=alt.Scale(scheme="blues", domain=[0, 1])),
+        tooltip=[
+            alt.Tooltip("calendar:N", title="Calendar"),
+            alt.Tooltip("period_start:T", title=resolution),
+            alt.Tooltip("booked_hours:Q", title="Booked hours", format=".1f"),
+            alt.Tooltip("open_hours:Q", title="Open hours"),
+            alt.Tooltip("utilization:Q", title="Utilization", format=".0%"),
+        ],
+    ).properties(
+        height=alt.Step(18),
+        width="container",
+        title=(
+            f"Calendar Utilization per {resolution} "
+            f"({OPEN_HOURS_PER_DAY} open hours/day, {len(OPEN_WEEKDAYS)} days/week)"
+        ),
+    )
+
+
+@app.cell
+def _(df, include_or_not_include):
+    if df is None or df.is_empty():
+        intervals = None
+        calendar_peaks = None
+    else:
+        # Only appointments kept by the include filter take up calendar time
+        intervals = traced_call(
+            "sweep_intervals", sweep_intervals, df.filter(include_filter(include_or_not_include.value))
+        )
+        calendar_peaks = traced_call("concurrency_peaks", concurrency_peaks, intervals)
+    return calendar_peaks, intervals
+
+
+@app.cell
+def _():
+    utilization_resolution = mo.ui.dropdown(
+        options=list(UTILIZATION_EVERY), value="Week", label="Resolution"
+    )
+    return (utilization_resolution,)
+
+
+@app.cell
+async def _(calendar_peaks, intervals, utilization_resolution):
+    if intervals is None:
+        utilization_section = mo.md(
+            """
+            <h2 style="text-align: center;">Calendar Utilization</h2>
+            <p style="text-align: center;">No data to display yet.</p>
+            """)
+    else:
+        await load_package("altair")
+
+        utilization = traced_call(
+            "calendar_utilization", calendar_utilization, intervals, utilization_resolution.value
+        )
+        # Pre-format for display, so the period is a plain date
+        utilization = utilization.with_columns(pl.col("period_start").dt.strftime("%Y-%m-%d"))
+        utilization_chart_value = traced_call(
+            "utilization_chart", cached_chart, utilization_chart, utilization, utilization_resolution.value
+        )
+
+        calendar_summary = calendar_peaks.join(
+            utilization.group_by("calendar").agg(
+                pl.col("booked_hours").sum().round(1).alias("booked_hours"),
+                # Over every period from the first to the last booking
+                (pl.col("booked_hours").sum() / pl.col("open_hours").sum()).round(3).alias("avg_utilization"),
+            ),
+            on="calendar",
+        ).sort("calendar")
+
+        utilization_section = mo.vstack(
             [
-                mo.md("<h2 style='text-align:center;'>Client Appointment Distribution</h2>"),
-                histogram_chart,
+                mo.md("<h2 style='text-align:center;'>Calendar Utilization</h2>"),
+                mo.hstack([utilization_resolution], justify="center"),
+                mo.ui.altair_chart(utilization_chart_value, chart_selection=False, legend_selection=False),
+                mo.ui.table(calendar_summary, selection=None),
+                mo.accordion(
+                    {
+                        "Double-booked appointments": intervals.filter(pl.col("double_booked"))
+                        .drop("double_booked", "block")
+                    },
+                    lazy=True,
+                ),
             ],
             justify="center",
         )
 
-    histogram_section
+    utilization_section
     return
 
 
@@ -708,13 +2233,13 @@ def _(result):
 
 
 @app.cell
-def _(filter_by_full_name, result):
+def _(filter_by_full_name, group_by, lifetime_values, result):
     # Initialize summary with a placeholder message
     summary = "Select a client from the dropdown above to see summary"
 
     # Filter the result table for selected client
     df_individual_summary = (
-        result.filter(pl.col("full_name") == filter_by_full_name.value)
+        traced_call("individual_summary", result.filter, pl.col("full_name") == filter_by_full_name.value)
         if filter_by_full_name is not None and filter_by_full_name.value is not None
         else None
     )
@@ -762,13 +2287,22 @@ def _(filter_by_full_name, result):
         # Total appointments
         total_appointments = df_individual_summary.height
 
+        # Lifetime value of the individuals behind the selected name
+        lifetime_value = lifetime_values.join(
+            df_individual_summary.select(group_by.value).unique(),
+            on=group_by.value,
+            how="semi",
+            nulls_equal=True,
+        )["lifetime_value"].sum()
+
         # Display summary
         summary = (
             f"**Client Visit Summary**<br>"
             f"- **Today's date:** {today.strftime('%Y-%m-%d')}<br>"
             f"- **Last visit date:** {last_visit_dt.strftime('%Y-%m-%d')}<br>"
             f"- **Months since last visit:** {months_since_human} ({months_since_last} months)<br>"
-            f"- **No. of Appointments:** {total_appointments}"
+            f"- **No. of Appointments:** {total_appointments}<br>"
+            f"- **Lifetime value:** ${lifetime_value:,.2f}"
         )
 
     mo.md(summary)
@@ -782,6 +2316,51 @@ def _(df_individual_summary):
     return
 
 
+@app.cell
+def _():
+    # -----------------------------
+    # Instrumentation Panel (edit mode)
+    # -----------------------------
+    trace_refresh = mo.ui.button(label="Refresh timings")
+    trace_clear = mo.ui.button(
+        label="Clear timings", on_click=lambda _: TRACE["events"].clear()
+    )
+    return trace_clear, trace_refresh
+
+
+@app.cell
+def _(df, df_individual_summary, result, trace_clear, trace_refresh):
+    # Re-render after the pipeline reruns so newly recorded stages show up
+    _ = (df, result, df_individual_summary)
+    if mo.app_meta().mode != "edit" or not TRACE["enabled"]:
+        trace_section = None
+    elif not TRACE["events"]:
+        trace_section = mo.vstack([
+            mo.md("## Pipeline Timings"),
+            mo.hstack([trace_refresh, trace_clear], justify="start"),
+            mo.md("No stages recorded yet."),
+        ])
+    else:
+        trace_events = list(TRACE["events"])
+        trace_table = pl.DataFrame(trace_events).drop("start_us")
+
+        trace_download = mo.download(
+            data=json.dumps(chrome_trace(trace_events)).encode(),
+            filename="data_explorer_trace.json",
+            mimetype="application/json",
+            label="Export Chrome trace",
+        )
+
+        trace_section = mo.vstack([
+            mo.md("## Pipeline Timings"),
+            mo.hstack([trace_refresh, trace_clear, trace_download], justify="start"),
+            mo.ui.table(trace_table, selection=None),
+        ])
+
+    trace_section
+    return
+
+
 @app.cell
 def _():
     footer_md = """
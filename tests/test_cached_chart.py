@@ -0,0 +1,24 @@
+import polars as pl
+
+import data_explorer
+from data_explorer import cached_chart
+
+
+def test_recently_used_chart_survives_eviction(monkeypatch):
+    monkeypatch.setattr(data_explorer, "CHART_CACHE", data_explorer.OrderedDict())
+    monkeypatch.setattr(data_explorer, "CHART_CACHE_SIZE", 2)
+
+    builds = []
+
+    def build(data, label):
+        builds.append(label)
+        return label
+
+    data = pl.DataFrame({"x": [1, 2, 3]})
+    cached_chart(build, data, "a")
+    cached_chart(build, data, "b")
+    cached_chart(build, data, "a")  # hit: "a" becomes most recently used
+    cached_chart(build, data, "c")  # evicts "b"
+    cached_chart(build, data, "a")
+
+    assert builds == ["a", "b", "c"]
@@ -0,0 +1,59 @@
+import os
+import time
+
+import polars as pl
+import pytest
+
+import data_explorer
+from data_explorer import directory_signature, ingest_files, watch_directory
+
+
+@pytest.fixture(autouse=True)
+def no_settle_wait(monkeypatch):
+    monkeypatch.setattr(data_explorer, "INGEST_SETTLE_SECONDS", 0.05)
+
+
+def write_export(path, n: int):
+    pl.DataFrame({"type": [f"t{i}" for i in range(n)], "value": range(n)}).write_csv(
+        path
+    )
+    # Backdate the file so it counts as settled
+    os.utime(path, (time.time() - 60, time.time() - 60))
+
+
+def test_unreadable_file_is_skipped_and_reported(tmp_path):
+    source = tmp_path / "exports"
+    source.mkdir()
+    write_export(source / "good.csv", 3)
+    (source / "broken.zip").write_bytes(b"not a zip archive")
+
+    df, skipped = ingest_files(list(source.iterdir()), tmp_path / "cache")
+
+    assert df.height == 3
+    assert list(skipped) == ["broken.zip"]
+
+
+def test_file_rewritten_in_place_is_read_again(tmp_path):
+    source = tmp_path / "exports"
+    source.mkdir()
+    export = source / "appointments.csv"
+    write_export(export, 3)
+    before = directory_signature(source)
+    assert ingest_files([export], tmp_path / "cache")[0].height == 3
+
+    write_export(export, 5)
+    assert directory_signature(source) != before
+    assert ingest_files([export], tmp_path / "cache")[0].height == 5
+
+
+def test_watcher_reports_a_change_once_it_settles(tmp_path):
+    write_export(tmp_path / "first.csv", 1)
+    reported = []
+    watch_directory(tmp_path, directory_signature(tmp_path), reported.append)
+
+    write_export(tmp_path / "second.csv", 1)
+    deadline = time.time() + 5
+    while not reported and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert [name for name, _, _ in reported[0]] == ["first.csv", "second.csv"]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import polars as pl
+
+from data_explorer import concurrency_peaks, sweep_intervals
+
+
+def appointments(*times: tuple[int, int, int, int]) -> pl.DataFrame:
+    """One calendar's appointments from (start h, start min, end h, end min)."""
+    return pl.DataFrame(
+        [
+            (
+                "Boston",
+                datetime(2025, 3, 3, start_hour, start_minute),
+                datetime(2025, 3, 3, end_hour, end_minute),
+                f"Client {i}",
+                "Initial",
+            )
+            for i, (start_hour, start_minute, end_hour, end_minute) in enumerate(times)
+        ],
+        schema=["calendar", "start_time", "end_time", "full_name", "type"],
+        orient="row",
+    )
+
+
+def test_back_to_back_appointments_do_not_overlap():
+    intervals = sweep_intervals(appointments((9, 0, 10, 0), (10, 0, 11, 0)))
+    peaks = concurrency_peaks(intervals)
+
+    assert intervals["double_booked"].to_list() == [False, False]
+    assert intervals["block"].n_unique() == 2
+    assert peaks["peak_concurrency"].to_list() == [1]
+
+
+def test_identical_start_times_are_double_booked():
+    intervals = sweep_intervals(
+        appointments((9, 0, 10, 0), (9, 0, 9, 30), (11, 0, 12, 0))
+    )
+    peaks = concurrency_peaks(intervals)
+
+    assert intervals["double_booked"].to_list() == [True, True, False]
+    assert peaks.row(0, named=True)["double_booked"] == 2
+    assert peaks.row(0, named=True)["peak_concurrency"] == 2
+
+
+def test_nested_appointment_shares_the_outer_block():
+    intervals = sweep_intervals(
+        appointments((9, 0, 12, 0), (10, 0, 10, 30), (11, 0, 11, 30))
+    )
+    peaks = concurrency_peaks(intervals)
+
+    assert intervals["double_booked"].to_list() == [True, True, True]
+    assert intervals["block"].n_unique() == 1
+    assert peaks["peak_concurrency"].to_list() == [2]
+    assert peaks["peak_at"].dt.hour().to_list() == [10]
+
+
+def test_end_and_start_at_the_same_instant_do_not_raise_the_peak():
+    intervals = sweep_intervals(
+        appointments((9, 0, 11, 0), (10, 0, 12, 0), (11, 0, 13, 0))
+    )
+    peaks = concurrency_peaks(intervals)
+
+    assert intervals["double_booked"].to_list() == [True, True, True]
+    assert peaks["peak_concurrency"].to_list() == [2]
+
+
+def test_rows_without_duration_or_calendar_are_skipped():
+    df = pl.concat(
+        [
+            appointments((9, 0, 9, 0), (10, 0, 11, 0)),
+            appointments((9, 0, 10, 0)).with_columns(
+                pl.lit(None, dtype=pl.String).alias("calendar")
+            ),
+        ]
+    )
+    assert sweep_intervals(df).height == 1
@@ -0,0 +1,81 @@
+import polars as pl
+import pytest
+
+from data_explorer import (
+    clean_references,
+    compile_references,
+    join_references,
+    read_reference_index,
+    store_references,
+)
+
+
+def references(*rows: tuple[str, str]) -> pl.DataFrame:
+    """Raw reference rows of (type, revised type)."""
+    return pl.DataFrame(
+        [(type_, "Yes", revised, "Initial", "No") for type_, revised in rows],
+        schema=[
+            "Type",
+            "Include or not include",
+            "Revised Type",
+            "Initial / Touch up",
+            "Free Touch Up",
+        ],
+        orient="row",
+    )
+
+
+def compile_rows(*rows: tuple[str, str]) -> pl.DataFrame:
+    return compile_references(clean_references(references(*rows)))
+
+
+def test_exact_duplicate_rows_are_dropped():
+    compiled = compile_rows(
+        ("Microblading", "Brows"), ("Microblading", "Brows"), ("Lips", "Lips")
+    )
+    assert compiled["type"].cast(pl.Utf8).to_list() == ["Lips", "Microblading"]
+
+
+def test_type_mapped_to_different_revised_types_is_rejected():
+    with pytest.raises(ValueError, match=r"Microblading \(Brows / Touch Up\)"):
+        compile_rows(("Microblading", "Brows"), ("Microblading", "Touch Up"))
+
+
+def test_store_reuses_version_and_writes_index_atomically(tmp_path):
+    df = references(("Microblading", "Brows"), ("Lips", "Lips"))
+    compiled, version = store_references(df, tmp_path)
+    again, same_version = store_references(df, tmp_path)
+
+    assert same_version == version
+    assert again.equals(compiled)
+    assert [
+        entry["version"] for entry in read_reference_index(tmp_path)["versions"]
+    ] == [version]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_unwritable_store_falls_back_to_memory(tmp_path):
+    blocked = tmp_path / "file"
+    blocked.write_text("")
+    compiled, version = store_references(
+        references(("Lips", "Lips")), blocked / "references"
+    )
+    assert compiled.height == 1
+    assert version
+
+
+def test_join_gives_unknown_types_null_mappings():
+    compiled = compile_rows(("Microblading", "Brows"))
+    joined = join_references(
+        pl.DataFrame({"type": ["Microblading", "Lash Lift"]}), compiled
+    )
+    assert joined["revised_type"].to_list() == ["Brows", None]
+
+
+def test_join_suffixes_reference_columns_already_in_the_data():
+    compiled = compile_rows(("Microblading", "Brows"))
+    data = pl.DataFrame({"type": ["Microblading"], "revised_type": ["Old"]})
+
+    joined = join_references(data, compiled)
+    assert joined["revised_type"].to_list() == ["Old"]
+    assert joined["revised_type_right"].to_list() == ["Brows"]
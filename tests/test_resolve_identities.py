@@ -0,0 +1,82 @@
+import polars as pl
+
+from data_explorer import resolve_identities
+
+
+def client_ids(*profiles: tuple[str, str, str, str]) -> list[str]:
+    """client_id for each (first name, last name, phone, email) profile, in order."""
+    df = pl.DataFrame(
+        profiles,
+        schema=["first_name", "last_name", "phone", "email"],
+        orient="row",
+    )
+    return resolve_identities(df)["client_id"].to_list()
+
+
+def test_same_phone_same_name_merges():
+    a, b = client_ids(
+        ("Olivia", "Smith", "+1 (617) 555-0101", "N/A"),
+        ("Olivia", "Smith", "617-555-0101", "olivia@x.com"),
+    )
+    assert a == b
+
+
+def test_same_phone_different_name_stays_split():
+    a, b = client_ids(
+        ("Mark", "Smith", "+1 (617) 555-0101", "N/A"),
+        ("Maria", "Smith", "+1 (617) 555-0101", "N/A"),
+    )
+    assert a != b
+
+
+def test_transposed_first_name_with_shared_phone_merges():
+    a, b = client_ids(
+        ("Olivia", "Smith", "+1 (617) 555-0101", "N/A"),
+        ("Olivai", "Smith", "+1 (617) 555-0101", "N/A"),
+    )
+    assert a == b
+
+
+def test_short_first_name_with_shared_email_merges():
+    a, b = client_ids(
+        ("Jo", "Brown", "N/A", "jo@x.com"),
+        ("J", "Brown", "N/A", "jo@x.com"),
+    )
+    assert a == b
+
+
+def test_name_only_match_without_conflict_merges():
+    a, b = client_ids(
+        ("Olivia", "Smith", "+1 (617) 555-0101", "olivia@x.com"),
+        ("Olivia", "Smyth", "N/A", "N/A"),
+    )
+    assert a == b
+
+
+def test_name_only_match_with_conflicting_phone_stays_split():
+    a, b = client_ids(
+        ("Olivia", "Smith", "+1 (617) 555-0101", "N/A"),
+        ("Olivia", "Smith", "+1 (781) 555-0199", "N/A"),
+    )
+    assert a != b
+
+
+def test_profile_without_contacts_does_not_bridge_conflicting_clients():
+    smith, smyth, other = client_ids(
+        ("Olivia", "Smith", "+1 (617) 555-0101", "olivia@x.com"),
+        ("Olivia", "Smyth", "N/A", "N/A"),
+        ("Olivia", "Smith", "+1 (781) 555-0199", "other@x.com"),
+    )
+    assert smith != other
+    assert smyth in (smith, other)
+
+
+def test_client_id_is_stable_across_row_order():
+    profiles = [
+        ("Olivia", "Smith", "+1 (617) 555-0101", "olivia@x.com"),
+        ("Olivia", "Smith", "617-555-0101", "N/A"),
+        ("Mark", "Jones", "+1 (781) 555-0199", "mark@x.com"),
+    ]
+    forward = client_ids(*profiles)
+    backward = client_ids(*reversed(profiles))
+    assert forward == backward[::-1]
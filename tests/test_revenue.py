@@ -0,0 +1,88 @@
+from datetime import date, datetime
+
+import polars as pl
+
+from data_explorer import build_revenue_cube, client_lifetime_value, slice_revenue
+
+
+def appointments(*rows: tuple) -> pl.DataFrame:
+    """
+    Appointments from (client_id, phone, calendar, local start time, price,
+    paid online).
+    """
+    return pl.DataFrame(
+        [
+            (client_id, phone, calendar, "Initial", "Initial", start, price, paid)
+            for client_id, phone, calendar, start, price, paid in rows
+        ],
+        schema={
+            "client_id": pl.String,
+            "phone": pl.String,
+            "calendar": pl.String,
+            "revised_type": pl.String,
+            "initial_touch_up": pl.String,
+            "start_time": pl.Datetime("us"),
+            "appointment_price": pl.Float64,
+            "amount_paid_online": pl.Float64,
+        },
+        orient="row",
+    ).with_columns(pl.col("start_time").dt.replace_time_zone("America/New_York"))
+
+
+def test_slice_means_come_from_summed_sums_and_counts():
+    cube = build_revenue_cube(
+        appointments(
+            ("a", "1", "Boston", datetime(2025, 1, 5, 10), 100.0, 50.0),
+            ("b", "2", "Boston", datetime(2025, 2, 5, 10), 300.0, None),
+            ("c", "3", "Nashua", datetime(2025, 2, 6, 10), None, 20.0),
+        )
+    )
+
+    by_calendar = slice_revenue(cube, ["calendar"]).rows_by_key(
+        "calendar", named=True, unique=True
+    )
+    # The mean of the per-month means would be 200; nulls are not counted
+    assert by_calendar["Boston"]["price_mean"] == 200.0
+    assert by_calendar["Boston"]["paid_online_mean"] == 50.0
+    assert by_calendar["Nashua"]["price_mean"] is None
+    assert by_calendar["Nashua"]["appointments"] == 1
+
+
+def test_empty_by_gives_one_total_row():
+    cube = build_revenue_cube(
+        appointments(
+            ("a", "1", "Boston", datetime(2025, 1, 5, 10), 100.0, 50.0),
+            ("b", "2", "Nashua", datetime(2025, 2, 5, 10), 300.0, 10.0),
+        )
+    )
+
+    total = slice_revenue(cube, [])
+    assert total.height == 1
+    assert total.row(0, named=True)["price_sum"] == 400.0
+
+    boston = slice_revenue(cube, [], {"calendar": ["Boston"]})
+    assert boston.row(0, named=True)["price_mean"] == 100.0
+
+
+def test_month_is_truncated_in_local_time():
+    # 9pm on 31 January in New York is already February in UTC
+    cube = build_revenue_cube(
+        appointments(
+            ("a", "1", "Boston", datetime(2025, 1, 31, 21), 100.0, 0.0),
+        )
+    )
+    assert cube["month"].to_list() == [date(2025, 1, 1)]
+
+
+def test_lifetime_value_follows_the_identity_columns():
+    df = appointments(
+        ("a", "617", "Boston", datetime(2025, 1, 5, 10), 100.0, 0.0),
+        ("b", "617", "Boston", datetime(2025, 3, 5, 10), 150.0, 0.0),
+        ("c", "781", "Boston", datetime(2025, 4, 5, 10), 80.0, 0.0),
+    )
+
+    assert client_lifetime_value(df, ["client_id"]).height == 3
+
+    by_phone = client_lifetime_value(df, ["phone"]).sort("phone")
+    assert by_phone["lifetime_value"].to_list() == [250.0, 80.0]
+    assert by_phone["appointments"].to_list() == [2, 1]
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import polars as pl
+
+import data_explorer
+from data_explorer import build_rollups, refresh_rollups
+
+
+def appointments(n: int, first_id: int = 1) -> pl.DataFrame:
+    """`n` appointments every 19 hours across two calendars and types."""
+    start = datetime(2025, 1, 1, 9)
+    return pl.DataFrame(
+        {
+            "appointment_id": range(first_id, first_id + n),
+            "start_time": [
+                start + timedelta(hours=19 * (first_id + i)) for i in range(n)
+            ],
+            "calendar": ["Boston", "Nashua"] * (n // 2) + ["Boston"] * (n % 2),
+            "revised_type": ["Touch Up"] * (n // 3) + ["Initial"] * (n - n // 3),
+        }
+    ).with_columns(pl.col("start_time").dt.replace_time_zone("America/New_York"))
+
+
+def assert_same_rollups(actual: dict, expected: dict):
+    for level, frame in expected.items():
+        keys = ["calendar", "revised_type", "period_start"]
+        assert actual[level].sort(keys).equals(frame.sort(keys)), level
+
+
+def test_appended_rows_are_folded_in(monkeypatch):
+    earlier = appointments(200)
+    rows = pl.concat([earlier, appointments(50, first_id=201)])
+    previous = refresh_rollups(None, earlier)
+
+    folded = []
+    update_rollups = data_explorer.update_rollups
+
+    def spy(rollups, appended):
+        folded.append(appended.height)
+        return update_rollups(rollups, appended)
+
+    monkeypatch.setattr(data_explorer, "update_rollups", spy)
+    state = refresh_rollups(previous, rows)
+
+    assert folded == [50]
+    assert_same_rollups(state["rollups"], build_rollups(rows))
+
+
+def test_changed_earlier_row_rebuilds():
+    earlier = appointments(200)
+    rows = pl.concat(
+        [
+            earlier.with_columns(
+                pl.when(pl.col("appointment_id") == 1)
+                .then(pl.lit("Nashua"))
+                .otherwise(pl.col("calendar"))
+                .alias("calendar")
+            ),
+            appointments(10, first_id=201),
+        ]
+    )
+    state = refresh_rollups(refresh_rollups(None, earlier), rows)
+    assert_same_rollups(state["rollups"], build_rollups(rows))
+
+
+def test_removed_rows_rebuild():
+    earlier = appointments(200)
+    rows = earlier.filter(pl.col("appointment_id") > 20)
+    state = refresh_rollups(refresh_rollups(None, earlier), rows)
+    assert_same_rollups(state["rollups"], build_rollups(rows))
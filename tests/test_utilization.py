@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import polars as pl
+
+import data_explorer
+from data_explorer import calendar_utilization
+
+
+def busy_blocks(*blocks: tuple[str, datetime, datetime]) -> pl.DataFrame:
+    """Sweep-style intervals with one merged block per (calendar, start, end)."""
+    return pl.DataFrame(
+        [(calendar, i, start, end) for i, (calendar, start, end) in enumerate(blocks)],
+        schema=["calendar", "block", "start_time", "end_time"],
+        orient="row",
+    ).with_columns(
+        pl.col("start_time", "end_time").dt.replace_time_zone("America/New_York")
+    )
+
+
+def test_block_across_a_week_boundary_is_split():
+    # Sunday 10pm to Monday 2am
+    intervals = busy_blocks(
+        ("Boston", datetime(2025, 3, 2, 22), datetime(2025, 3, 3, 2))
+    )
+    weekly = calendar_utilization(intervals, "Week")
+
+    assert weekly["booked_hours"].to_list() == [2.0, 2.0]
+    assert weekly["period_start"].dt.date().to_list() == [
+        datetime(2025, 2, 24).date(),
+        datetime(2025, 3, 3).date(),
+    ]
+
+
+def test_daily_utilization_uses_open_hours():
+    intervals = busy_blocks(
+        ("Boston", datetime(2025, 3, 3, 9), datetime(2025, 3, 3, 14, 30))
+    )
+    daily = calendar_utilization(intervals, "Day")
+
+    assert daily["utilization"].to_list() == [5.5 / data_explorer.OPEN_HOURS_PER_DAY]
+
+
+def test_closed_weekdays_are_not_open_hours(monkeypatch):
+    monkeypatch.setattr(data_explorer, "OPEN_WEEKDAYS", [1, 2, 3, 4, 5])
+    intervals = busy_blocks(
+        ("Boston", datetime(2025, 3, 3, 9), datetime(2025, 3, 3, 20)),
+        ("Boston", datetime(2025, 3, 8, 9), datetime(2025, 3, 8, 12)),
+    )
+
+    weekly = calendar_utilization(intervals, "Week")
+    assert weekly["open_hours"].to_list() == [5 * data_explorer.OPEN_HOURS_PER_DAY]
+
+    # Monday fully booked, Tuesday to Friday empty, Saturday closed
+    daily = calendar_utilization(intervals, "Day")
+    assert daily["utilization"].to_list() == [1.0, 0.0, 0.0, 0.0, 0.0, None]
+
+
+def test_weeks_without_bookings_count_as_empty():
+    intervals = busy_blocks(
+        ("Boston", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 20)),
+        ("Boston", datetime(2025, 6, 2, 9), datetime(2025, 6, 2, 20)),
+    )
+    weekly = calendar_utilization(intervals, "Week")
+
+    assert weekly.height == 22
+    assert weekly["booked_hours"].sum() / weekly["open_hours"].sum() == 2 / (22 * 7)
+
+
+def test_daylight_saving_day_is_one_period():
+    # Clocks go forward at 2am on 9 March 2025 in New York
+    intervals = busy_blocks(
+        ("Boston", datetime(2025, 3, 8, 9), datetime(2025, 3, 10, 10))
+    )
+    daily = calendar_utilization(intervals, "Day")
+
+    assert daily["period_start"].dt.day().to_list() == [8, 9, 10]
+    assert daily["booked_hours"].to_list() == [15.0, 23.0, 10.0]